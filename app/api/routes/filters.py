@@ -5,6 +5,8 @@ from typing import Dict, List
 
 from fastapi import APIRouter
 
+from ...core.state import filter_registry
+
 router = APIRouter(tags=["filters"])
 logger = logging.getLogger(__name__)
 
@@ -37,8 +39,6 @@ async def get_filter_options() -> Dict[str, List[str]]:
             ]
         }
     """
-    from ...core.state import filter_registry
-
     conversation_ids = filter_registry.get_conversation_ids()
     workforce_names = filter_registry.get_workforce_names()
 
@@ -60,6 +60,4 @@ async def get_filter_stats() -> Dict[str, int]:
     Returns:
         Dictionary with counts of currently tracked values
     """
-    from ...core.state import filter_registry
-
     return filter_registry.get_stats()
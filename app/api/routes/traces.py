@@ -1,18 +1,29 @@
-import gzip
+import asyncio
 import logging
 from typing import List
 
+import orjson
 from fastapi import APIRouter, Request, Response, status
 from google.protobuf import json_format
 from google.protobuf.message import DecodeError
 from opentelemetry.proto.collector.trace.v1 import trace_service_pb2
 
 from ...core.span_preprocessor import preprocess_spans
+from ...core.state import connection_manager, filter_registry
 from ...models.events import CommunicationEvent
+from ...utils.compression import gzip_decompress
 
 router = APIRouter(tags=["traces"])
 logger = logging.getLogger(__name__)
 
+# Bodies that decompress to more than this size are decompressed and parsed in a worker thread, so large
+# exports do not block WebSocket delivery. Smaller bodies are handled inline, where a thread handoff costs more
+_OFFLOAD_THRESHOLD = 256 * 1024
+
+# The export response is always empty, so it is serialized once instead of per request
+_EMPTY_RESPONSE_PROTOBUF = trace_service_pb2.ExportTraceServiceResponse().SerializeToString()
+_EMPTY_RESPONSE_JSON = json_format.MessageToJson(trace_service_pb2.ExportTraceServiceResponse()).encode()
+
 
 async def distribute_events(
     events: List[CommunicationEvent],
@@ -23,20 +34,51 @@ async def distribute_events(
     Args:
         events: List of CommunicationEvent objects
     """
-    from ...core.state import connection_manager, filter_registry
-
+    # Checked once, so the per-event message is only formatted when debug logging is enabled
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    # Without subscribers, e.g. an idle dashboard, only the filter values need to be registered
+    has_subscribers = connection_manager.connection_count > 0
+    payloads = []
     for event in events:
         # Register filter values for the API
         filter_registry.register_event(event.conversation_id, event.workforce_name)
 
-        event_data = event.to_dict()
+        # Serialize once per event, orjson encodes the dataclass and its nested content natively
+        if has_subscribers:
+            payloads.append(orjson.dumps(event))
 
-        # Send to all connections whose filters match
-        await connection_manager.send_message(data=event_data, event=event)
+        if debug_enabled:
+            logger.debug(
+                f"Distributed {event.event_type} from {event.acting_agent} in conversation {event.conversation_id}"
+            )
 
-        logger.debug(
-            f"Distributed {event.event_type} from {event.acting_agent} in conversation {event.conversation_id}"
-        )
+    # Send each connection the events matching its filters in a single frame
+    if has_subscribers:
+        connection_manager.send_batch(payloads=payloads, events=events)
+
+
+def _decompressed_size(body: bytes, gzipped: bool) -> int:
+    """
+    Estimate the size of a request body after decompression, without decompressing it.
+
+    The last four bytes of a gzip member hold its uncompressed size modulo 4 GiB. The estimate only
+    decides whether the body is decompressed in a worker thread, so malformed bodies do no harm.
+
+    Args:
+        body: The raw request body
+        gzipped: Whether the body is gzip encoded
+
+    Returns:
+        The estimated size of the decompressed body in bytes
+    """
+    if gzipped and len(body) >= 4:
+        return max(len(body), int.from_bytes(body[-4:], "little"))
+    return len(body)
+
+
+def _parse_json(body: bytes, export_request: trace_service_pb2.ExportTraceServiceRequest) -> None:
+    """Parse an OTLP/JSON body into the export request."""
+    json_format.Parse(body.decode("utf-8"), export_request)
 
 
 @router.post("/v1/traces")
@@ -46,25 +88,41 @@ async def receive_traces(request: Request) -> Response:
     Accepts both protobuf-encoded and JSON trace data from OpenTelemetry collectors/exporters.
     """
     body = await request.body()
-    content_type = request.headers.get("content-type", "").lower()
-    content_encoding = request.headers.get("content-encoding", "").lower()
+    # Compare the media type without parameters such as charset, once for the whole request
+    media_type = request.headers.get("content-type", "").partition(";")[0].strip().lower()
+    is_json = media_type == "application/json"
+    content_encoding = request.headers.get("content-encoding")
+    gzipped = content_encoding is not None and "gzip" in content_encoding.lower()
+    # Decided on the decompressed size, as a small gzip body can inflate to a large export
+    offload = _decompressed_size(body, gzipped) > _OFFLOAD_THRESHOLD
 
     # Decompress if gzip encoded
-    if "gzip" in content_encoding:
+    if gzipped:
         try:
-            body = gzip.decompress(body)
+            if offload:
+                body = await asyncio.to_thread(gzip_decompress, body)
+            else:
+                body = gzip_decompress(body)
         except Exception as e:
             logger.error(f"Failed to decompress gzip data: {e}")
             return Response(content="Invalid gzip data", status_code=status.HTTP_400_BAD_REQUEST)
+        # The trailer is only an estimate, parsing is decided on the actual size
+        offload = len(body) > _OFFLOAD_THRESHOLD
 
     export_request = trace_service_pb2.ExportTraceServiceRequest()
 
     # Parse based on content type
-    if "application/json" in content_type:
-        json_format.Parse(body.decode("utf-8"), export_request)
-    elif "application/x-protobuf" in content_type:
+    if is_json:
+        if offload:
+            await asyncio.to_thread(_parse_json, body, export_request)
+        else:
+            _parse_json(body, export_request)
+    elif media_type == "application/x-protobuf":
         try:
-            export_request.ParseFromString(body)
+            if offload:
+                await asyncio.to_thread(export_request.ParseFromString, body)
+            else:
+                export_request.ParseFromString(body)
         except DecodeError:
             logger.exception("Failed to parse protobuf data")
             return Response(content="Invalid protobuf data", status_code=status.HTTP_400_BAD_REQUEST)
@@ -83,12 +141,9 @@ async def receive_traces(request: Request) -> Response:
     else:
         logger.debug("No relevant communication events found")
 
-    response = trace_service_pb2.ExportTraceServiceResponse()
-    if "application/json" in content_type:
-        return Response(
-            content=json_format.MessageToJson(response), media_type="application/json", status_code=status.HTTP_200_OK
-        )
+    if is_json:
+        return Response(content=_EMPTY_RESPONSE_JSON, media_type="application/json", status_code=status.HTTP_200_OK)
     else:
         return Response(
-            content=response.SerializeToString(), media_type="application/x-protobuf", status_code=status.HTTP_200_OK
+            content=_EMPTY_RESPONSE_PROTOBUF, media_type="application/x-protobuf", status_code=status.HTTP_200_OK
         )
@@ -1,14 +1,33 @@
-import json
 import logging
+from typing import Any, Dict
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from ...core.state import connection_manager
 from ...models.filters import FilterCriteria
 
 router = APIRouter(tags=["websockets"])
 logger = logging.getLogger(__name__)
 
 
+def _welcome_message(filter_criteria: FilterCriteria) -> Dict[str, Any]:
+    """Build the welcome message confirming the filters of a new connection."""
+    return {
+        "type": "connection_established",
+        "message": "Connected to observability dashboard",
+        "filters": {
+            "conversation_id": filter_criteria.conversation_id,
+            "workforce": filter_criteria.workforce,
+        },
+    }
+
+
+# Most dashboards connect without filters, so that welcome message is encoded once at import time.
+# Filter values come from the client and are encoded per connection so they are escaped properly
+_UNFILTERED_WELCOME_MESSAGE = orjson.dumps(_welcome_message(FilterCriteria.EMPTY))
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket) -> None:
     """
@@ -24,28 +43,22 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
     - /ws?workforce=foo - Only events with workforce=foo
     - /ws?conversation_id=abc-123&workforce=foo - Both filters applied
     """
-    from ...core.state import connection_manager
-
     # Parse filter criteria from query parameters
-    query_params = dict(websocket.query_params)
-    filter_criteria = FilterCriteria.from_query_params(query_params)
+    filter_criteria = FilterCriteria.from_query_params(websocket.query_params)
 
     # Connect with filter criteria
     await connection_manager.connect(websocket, filter_criteria)
 
     try:
         # Send welcome message
-        welcome_data = {
-            "type": "connection_established",
-            "message": "Connected to observability dashboard",
-            "filters": {
-                "conversation_id": filter_criteria.conversation_id,
-                "workforce": filter_criteria.workforce,
-            },
-        }
-
         try:
-            await websocket.send_text(json.dumps(welcome_data))
+            if filter_criteria.is_empty():
+                welcome_message = _UNFILTERED_WELCOME_MESSAGE
+            else:
+                welcome_message = orjson.dumps(_welcome_message(filter_criteria))
+            # Sent as a binary frame like the events, so clients decode a single frame type.
+            # Queued like the events, so it is sent before any of them
+            connection_manager.send_personal_message(welcome_message, websocket)
         except (TypeError, ValueError) as e:
             logger.exception(f"JSON serialization error for welcome message: {e}")
             await websocket.close(code=4500, reason="Internal server error")
@@ -60,11 +73,11 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
                 # Optional: Allow clients to update their filters dynamically
                 if data.startswith("{"):
                     try:
-                        message = json.loads(data)
+                        message = orjson.loads(data)
                         if message.get("type") == "update_filter":
                             # Future enhancement: update filter_criteria in connection_manager
                             logger.info(f"Filter update requested: {message}")
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         pass
 
             except WebSocketDisconnect:
@@ -1,23 +1,68 @@
-import json
+import asyncio
 import logging
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Set
 
 from fastapi import WebSocket, WebSocketDisconnect
 
 from ..models.filters import FilterCriteria
 
+Connections = Dict[WebSocket, FilterCriteria]
+# Maps websockets to the compiled predicate of their FilterCriteria
+Matchers = Dict[WebSocket, Callable[[Any], bool]]
+
+# Errors of a send to a client that went away or stopped reading. OSError covers
+# ConnectionResetError and the disconnect errors of the ASGI servers, RuntimeError
+# is raised when sending on a websocket that is already closed
+_SEND_ERRORS = (WebSocketDisconnect, OSError, RuntimeError, asyncio.TimeoutError)
+
+# Close code of websockets dropped for being too slow, telling clients to reconnect later
+_TRY_AGAIN_LATER = 1013
+
+
+# Envelope of batch frames, kept as bytes so wrapping the encoded events is a plain concatenation.
+# Further envelope fields (e.g. a schema version) belong in the prefix instead of a per-send dict
+_BATCH_PREFIX = b'{"type":"batch","events":['
+_BATCH_SUFFIX = b"]}"
+
+
+def _batch_frame(payloads: List[bytes]) -> bytes:
+    """Join encoded events into a {"type": "batch", "events": [...]} message."""
+    return _BATCH_PREFIX + b",".join(payloads) + _BATCH_SUFFIX
+
 
 class ConnectionManager:
     """
     Manages WebSocket connections with per-connection filtering.
 
     Each connection can have its own FilterCriteria that determines
-    which events it receives.
+    which events it receives. Messages are queued per connection and sent by a
+    writer task of that connection, so broadcasting never waits for a client.
     """
 
-    def __init__(self) -> None:
-        # Store tuples of (websocket, filter_criteria)
-        self.connections: List[Tuple[WebSocket, FilterCriteria]] = []
+    def __init__(self, send_timeout_seconds: float = 5.0, max_queued_messages: int = 100) -> None:
+        """
+        Initialize the connection manager.
+
+        Args:
+            send_timeout_seconds: How long a single send may take before the websocket
+                is considered stuck and disconnected (default: 5.0)
+            max_queued_messages: How many messages may wait for a websocket before it is
+                considered too slow and disconnected (default: 100)
+        """
+        # Map each websocket to its filter_criteria; dicts keep insertion order and remove in O(1)
+        self.connections: Connections = {}
+        # Index connections by their most selective filter value, so broadcasting an event
+        # only visits connections that can match it instead of scanning all of them
+        self._unfiltered: Matchers = {}
+        self._by_conversation: Dict[str, Matchers] = {}
+        self._by_workforce: Dict[str, Matchers] = {}
+        # Pending messages and the task sending them for each websocket
+        self._queues: Dict[WebSocket, asyncio.Queue[bytes]] = {}
+        self._writers: Dict[WebSocket, asyncio.Task[None]] = {}
+        # Pending closes of dropped websockets, referenced until done so they are not garbage collected
+        self._closing: Set[asyncio.Task[None]] = set()
+        self.send_timeout = send_timeout_seconds
+        self.max_queued_messages = max_queued_messages
         self.logger = logging.getLogger(__name__)
 
     async def connect(self, websocket: WebSocket, filter_criteria: FilterCriteria) -> None:
@@ -29,59 +74,161 @@ class ConnectionManager:
             filter_criteria: Filter criteria for this connection
         """
         await websocket.accept()
-        self.connections.append((websocket, filter_criteria))
+        self.connections[websocket] = filter_criteria
+        self._bucket(filter_criteria)[websocket] = filter_criteria.compile()
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=self.max_queued_messages)
+        self._queues[websocket] = queue
+        self._writers[websocket] = asyncio.create_task(self._writer(websocket, queue))
 
         filter_desc = self._describe_filter(filter_criteria)
         self.logger.info(f"Connected websocket with filter: {filter_desc}. Total connections: {len(self.connections)}")
 
     def disconnect(self, websocket: WebSocket) -> None:
-        """Remove a WebSocket connection."""
-        original_count = len(self.connections)
-        self.connections = [(ws, fc) for ws, fc in self.connections if ws != websocket]
-
-        if len(self.connections) < original_count:
+        """Remove a WebSocket connection and stop sending it messages."""
+        if self._remove(websocket):
             self.logger.info(f"Disconnected websocket. Remaining connections: {len(self.connections)}")
 
-    async def send_message(
+    def send_personal_message(self, payload: bytes, websocket: WebSocket) -> None:
+        """
+        Queue a message for a single connection, in order with the events sent to it.
+
+        Args:
+            payload: The UTF-8 encoded JSON message
+            websocket: The WebSocket connection to send the message to
+        """
+        queue = self._queues.get(websocket)
+        if queue is not None:
+            self._enqueue(websocket, queue, payload)
+
+    def send_batch(
         self,
-        data: Dict[str, Any],
-        event: Any,  # CommunicationEvent (using Any to avoid circular import)
+        payloads: List[bytes],
+        events: List[Any],  # CommunicationEvents (using Any to avoid circular import)
     ) -> None:
         """
-        Send a message to all connections whose filters match.
+        Queue a batch of messages for all connections whose filters match.
+
+        Each connection receives a single binary frame of the form
+        {"type": "batch", "events": [...]} holding the events that match its filter, so a
+        burst of events costs one frame per connection instead of one per event. The frame
+        is assembled from the already encoded payloads instead of re-encoding the events.
+        Frames are only queued here, a connection whose queue is full is disconnected.
 
         Args:
-            data: The event data to send (already serializable)
-            event: The CommunicationEvent object to match against filters
+            payloads: The UTF-8 encoded JSON of each event
+            events: The CommunicationEvent objects to match against filters, in the same order
         """
         if not self.connections:
             return
 
-        message = json.dumps(data, ensure_ascii=False)
-        disconnected = []
-        sent_count = 0
-
-        for websocket, filter_criteria in self.connections:
-            # Check if this connection's filter matches the event
-            if not filter_criteria.matches(event):
-                continue
-
+        batches: Dict[WebSocket, List[bytes]] = {}
+        for payload, event in zip(payloads, events):
+            # The index already guarantees that unfiltered and workforce-only connections match
+            for websocket in self._unfiltered:
+                batches.setdefault(websocket, []).append(payload)
+            for websocket in self._by_workforce.get(event.workforce_name, {}):
+                batches.setdefault(websocket, []).append(payload)
+            # Connections filtering on both fields are only indexed by conversation_id
+            for websocket, matcher in self._by_conversation.get(event.conversation_id, {}).items():
+                if matcher(event):
+                    batches.setdefault(websocket, []).append(payload)
+
+        lagging: List[WebSocket] = []
+        for websocket, batch in batches.items():
             try:
-                await websocket.send_text(message)
-                sent_count += 1
-            except (WebSocketDisconnect, ConnectionResetError, Exception) as e:
-                self.logger.warning(f"Failed to send message to websocket: {type(e).__name__}: {e}")
-                disconnected.append(websocket)
-
-        # Clean up disconnected websockets
-        for websocket in disconnected:
+                self._queues[websocket].put_nowait(_batch_frame(batch))
+            except asyncio.QueueFull:
+                lagging.append(websocket)
+
+        self.logger.debug(f"Queued {len(payloads)} events for {len(batches)}/{len(self.connections)} connections")
+
+        # Removed together after the fan-out, with a single log line instead of one per websocket
+        if lagging:
+            for websocket in lagging:
+                self._drop(websocket)
+            self.logger.warning(
+                f"Disconnected {len(lagging)} websockets with {self.max_queued_messages} unsent messages. "
+                f"Remaining connections: {len(self.connections)}"
+            )
+
+    def _enqueue(self, websocket: WebSocket, queue: asyncio.Queue[bytes], payload: bytes) -> None:
+        """Queue a message for a websocket, disconnecting it if it has fallen too far behind."""
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.logger.warning(f"Websocket has {queue.qsize()} unsent messages, disconnecting it")
+            self._drop(websocket)
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue[bytes]) -> None:
+        """Send the queued messages of a websocket until it disconnects or a send fails."""
+        try:
+            while True:
+                payload = await queue.get()
+                await asyncio.wait_for(websocket.send_bytes(payload), self.send_timeout)
+        except _SEND_ERRORS as e:
+            self.logger.warning(f"Failed to send message to websocket: {type(e).__name__}: {e}")
+            self._drop(websocket)
+        finally:
+            # Also reached when cancelled by disconnect(), in which case this is a no-op.
+            # Unexpected errors still propagate after the websocket is removed
             self.disconnect(websocket)
 
-        if disconnected:
-            self.logger.info(f"Removed {len(disconnected)} disconnected websockets. Remaining: {len(self.connections)}")
+    def _remove(self, websocket: WebSocket) -> bool:
+        """Unregister a websocket and stop its writer task, returning whether it was connected."""
+        filter_criteria = self.connections.pop(websocket, None)
+        if filter_criteria is None:
+            return False
+        self._remove_from_bucket(websocket, filter_criteria)
+        self._queues.pop(websocket, None)
+        writer = self._writers.pop(websocket, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+        return True
+
+    def _drop(self, websocket: WebSocket) -> None:
+        """
+        Unregister a websocket that fell behind or failed a send, and close it.
+
+        Closing ends the endpoint waiting for client messages and lets a slow but healthy
+        client notice that it no longer receives events and reconnect.
+        """
+        if self._remove(websocket):
+            closing = asyncio.create_task(self._close(websocket))
+            self._closing.add(closing)
+            closing.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        """Close a dropped websocket, ignoring clients that are already gone or do not respond."""
+        try:
+            await asyncio.wait_for(websocket.close(code=_TRY_AGAIN_LATER), self.send_timeout)
+        except _SEND_ERRORS:
+            pass
+
+    def _bucket(self, filter_criteria: FilterCriteria) -> Matchers:
+        """Get the index bucket for a connection with the given filter criteria."""
+        if filter_criteria.conversation_id is not None:
+            return self._by_conversation.setdefault(filter_criteria.conversation_id, {})
+        if filter_criteria.workforce is not None:
+            return self._by_workforce.setdefault(filter_criteria.workforce, {})
+        return self._unfiltered
+
+    def _remove_from_bucket(self, websocket: WebSocket, filter_criteria: FilterCriteria) -> None:
+        """Remove a connection from its index bucket, dropping buckets that become empty."""
+        if filter_criteria.conversation_id is not None:
+            index, key = self._by_conversation, filter_criteria.conversation_id
+        elif filter_criteria.workforce is not None:
+            index, key = self._by_workforce, filter_criteria.workforce
+        else:
+            self._unfiltered.pop(websocket, None)
+            return
 
-        if sent_count > 0:
-            self.logger.debug(f"Sent message to {sent_count}/{len(self.connections)} connections")
+        # Single lookup, without recreating a bucket that is already gone
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(websocket, None)
+        if not bucket:
+            index.pop(key, None)
 
     def _describe_filter(self, filter_criteria: FilterCriteria) -> str:
         """Create a human-readable description of filter criteria."""
@@ -1,8 +1,9 @@
 """Registry for tracking unique filter values seen in events."""
 
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Dict
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +16,28 @@ class FilterRegistry:
     that have been seen in recent events. Values automatically expire after the TTL period.
     """
 
-    def __init__(self, ttl_hours: int = 24):
+    def __init__(self, ttl_hours: int = 24, cleanup_interval_seconds: int = 60, refresh_interval_seconds: int = 60):
         """
         Initialize the filter registry.
 
         Args:
             ttl_hours: Time-to-live in hours for tracked values (default: 24)
+            cleanup_interval_seconds: Minimum time between expiry sweeps; reads in between
+                may include values that expired since the last sweep (default: 60)
+            refresh_interval_seconds: Minimum time before the last seen time of a known value
+                is updated again, keeping the registry untouched for repeated values (default: 60)
         """
-        self.conversation_ids: Dict[str, datetime] = {}
-        self.workforce_names: Dict[str, datetime] = {}
-        self.ttl = timedelta(hours=ttl_hours)
+        # Map values to the time.monotonic() timestamp they were last seen at. Ordered from least
+        # to most recently seen, so expired entries are always at the front
+        self.conversation_ids: OrderedDict[str, float] = OrderedDict()
+        self.workforce_names: OrderedDict[str, float] = OrderedDict()
+        self.ttl_seconds = ttl_hours * 3600
+        self.cleanup_interval_seconds = cleanup_interval_seconds
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._last_cleanup = time.monotonic()
+        # Sorted values returned to the API, reset whenever a value is added or removed
+        self._sorted_conversation_ids: Optional[List[str]] = None
+        self._sorted_workforce_names: Optional[List[str]] = None
         logger.info(f"FilterRegistry initialized with TTL of {ttl_hours} hours")
 
     def register_event(self, conversation_id: str, workforce_name: str | None) -> None:
@@ -35,18 +48,26 @@ class FilterRegistry:
             conversation_id: The conversation ID from the event
             workforce_name: The workforce name from the event (can be None)
         """
-        now = datetime.now(timezone.utc)
+        now = time.monotonic()
 
         # Track conversation_id
-        if conversation_id not in self.conversation_ids:
+        last_seen = self.conversation_ids.get(conversation_id)
+        if last_seen is None:
             logger.debug(f"Registered new conversation_id: {conversation_id}")
-        self.conversation_ids[conversation_id] = now
+            self._sorted_conversation_ids = None
+        if last_seen is None or now - last_seen >= self.refresh_interval_seconds:
+            self.conversation_ids[conversation_id] = now
+            self.conversation_ids.move_to_end(conversation_id)
 
         # Track workforce_name if present
         if workforce_name:
-            if workforce_name not in self.workforce_names:
+            last_seen = self.workforce_names.get(workforce_name)
+            if last_seen is None:
                 logger.debug(f"Registered new workforce_name: {workforce_name}")
-            self.workforce_names[workforce_name] = now
+                self._sorted_workforce_names = None
+            if last_seen is None or now - last_seen >= self.refresh_interval_seconds:
+                self.workforce_names[workforce_name] = now
+                self.workforce_names.move_to_end(workforce_name)
 
     def get_conversation_ids(self) -> list[str]:
         """
@@ -56,7 +77,9 @@ class FilterRegistry:
             Sorted list of conversation IDs seen within the TTL window
         """
         self._cleanup()
-        return sorted(self.conversation_ids.keys())
+        if self._sorted_conversation_ids is None:
+            self._sorted_conversation_ids = sorted(self.conversation_ids.keys())
+        return list(self._sorted_conversation_ids)
 
     def get_workforce_names(self) -> list[str]:
         """
@@ -66,29 +89,61 @@ class FilterRegistry:
             Sorted list of workforce names seen within the TTL window
         """
         self._cleanup()
-        return sorted(self.workforce_names.keys())
+        if self._sorted_workforce_names is None:
+            self._sorted_workforce_names = sorted(self.workforce_names.keys())
+        return list(self._sorted_workforce_names)
 
-    def _cleanup(self) -> None:
-        """Remove expired entries based on TTL."""
-        now = datetime.now(timezone.utc)
-        cutoff = now - self.ttl
-
-        # Clean up expired conversation IDs
-        expired_conversations = [k for k, v in self.conversation_ids.items() if v <= cutoff]
-        for k in expired_conversations:
-            del self.conversation_ids[k]
+    def clear(self) -> None:
+        """Remove all tracked values."""
+        self.conversation_ids.clear()
+        self.workforce_names.clear()
+        self._sorted_conversation_ids = None
+        self._sorted_workforce_names = None
 
-        # Clean up expired workforce names
-        expired_workforces = [k for k, v in self.workforce_names.items() if v <= cutoff]
-        for k in expired_workforces:
-            del self.workforce_names[k]
+    def _cleanup(self) -> None:
+        """Remove expired entries based on TTL, at most once per cleanup interval."""
+        now = time.monotonic()
+        if now - self._last_cleanup < self.cleanup_interval_seconds:
+            return
+        self._last_cleanup = now
+        cutoff = now - self.ttl_seconds
+
+        expired_conversations = self._remove_expired(self.conversation_ids, cutoff)
+        expired_workforces = self._remove_expired(self.workforce_names, cutoff)
+        if expired_conversations:
+            self._sorted_conversation_ids = None
+        if expired_workforces:
+            self._sorted_workforce_names = None
 
         if expired_conversations or expired_workforces:
             logger.debug(
-                f"Cleaned up {len(expired_conversations)} conversation_ids and "
-                f"{len(expired_workforces)} workforce_names (expired after {self.ttl})"
+                f"Cleaned up {expired_conversations} conversation_ids and "
+                f"{expired_workforces} workforce_names (expired after {self.ttl_seconds}s)"
             )
 
+    @staticmethod
+    def _remove_expired(entries: OrderedDict[str, float], cutoff: float) -> int:
+        """
+        Remove entries last seen at or before the cutoff.
+
+        Entries are ordered by last seen time, so the scan stops at the first one still within the TTL.
+
+        Args:
+            entries: Mapping of values to the monotonic time they were last seen
+            cutoff: Entries last seen at or before this monotonic time are removed
+
+        Returns:
+            Number of removed entries
+        """
+        removed = 0
+        while entries:
+            last_seen = next(iter(entries.values()))
+            if last_seen > cutoff:
+                break
+            entries.popitem(last=False)
+            removed += 1
+        return removed
+
     def get_stats(self) -> Dict[str, int]:
         """
         Get statistics about tracked filter values.
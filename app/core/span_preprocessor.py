@@ -1,6 +1,7 @@
+import functools
 import logging
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from google.protobuf.internal.containers import RepeatedCompositeFieldContainer
 from opentelemetry.proto.collector.trace.v1 import trace_service_pb2
@@ -27,13 +28,14 @@ logger = logging.getLogger(__name__)
 def _extract_attribute_value(attr_value: common_pb2.AnyValue) -> Union[str, int, float, bool, None]:
     """Extract the actual value from an OTEL attribute value."""
     try:
+        # Most attributes are strings, HasField answers those faster than WhichOneof and a comparison
+        if attr_value.HasField("string_value"):
+            return attr_value.string_value
         value_type = attr_value.WhichOneof("value")
         if not value_type:
             return None
 
-        if value_type == "string_value":
-            return attr_value.string_value
-        elif value_type == "int_value":
+        if value_type == "int_value":
             return attr_value.int_value
         elif value_type == "double_value":
             return attr_value.double_value
@@ -47,27 +49,31 @@ def _extract_attribute_value(attr_value: common_pb2.AnyValue) -> Union[str, int,
         return None
 
 
-def _determine_event_type(span_name: str) -> Optional[str]:
-    """Determine the event type based on span name and attributes."""
-    span_name_lower = span_name.lower()
+# Span name prefixes (lowercase) and the event types they mark, checked in order
+_EVENT_TYPE_PREFIXES = (
+    ("before_agent", "agent_start"),
+    ("before_model", "llm_call_start"),
+    ("before_llm", "llm_call_start"),
+    ("after_model", "llm_call_end"),
+    ("after_llm", "llm_call_end"),
+    ("on_model_error", "llm_call_error"),
+    ("before_tool", "tool_call_start"),
+    ("after_tool", "tool_call_end"),
+    ("on_tool_error", "tool_call_error"),
+    ("after_agent", "agent_end"),
+)
+
 
-    if span_name_lower.startswith("before_agent"):
-        return "agent_start"
-    elif span_name_lower.startswith(("before_model", "before_llm")):
-        return "llm_call_start"
-    elif span_name_lower.startswith(("after_model", "after_llm")):
-        return "llm_call_end"
-    elif span_name_lower.startswith("on_model_error"):
-        return "llm_call_error"
-    elif span_name_lower.startswith("before_tool"):
-        return "tool_call_start"
-    elif span_name_lower.startswith("after_tool"):
-        return "tool_call_end"
-    elif span_name_lower.startswith("on_tool_error"):
-        return "tool_call_error"
-    elif span_name_lower.startswith("after_agent"):
-        return "agent_end"
+@functools.lru_cache(maxsize=1024)
+def _determine_event_type(span_name: str) -> Optional[str]:
+    """Determine the event type based on span name.
 
+    Only a handful of span names occur, so each is matched once and then answered from the cache.
+    """
+    span_name_lower = span_name.lower()
+    for prefix, event_type in _EVENT_TYPE_PREFIXES:
+        if span_name_lower.startswith(prefix):
+            return event_type
     return None
 
 
@@ -83,6 +89,23 @@ EVENT_FACTORY_MAP: Dict[str, Callable[[str, str, str, Dict[str, Any], Dict[str,
     "tool_call_error": create_tool_call_error_event,
 }
 
+# Attribute key prefixes read for each event type, by _process_single_span and the factory.
+# Other attributes, e.g. the LLM contents on agent spans, are never decoded.
+# Extend these when a factory starts reading a new attribute
+_REQUIRED_ATTRIBUTE_PREFIXES = ("conversation_id", "agent_name", "invocation_id")
+_LLM_REQUEST_ATTRIBUTE_PREFIXES = ("model", "user_content.", "llm_request.")
+_TOOL_CALL_ATTRIBUTE_PREFIXES = ("tool_name", "args.")
+ATTRIBUTE_PREFIX_MAP: Dict[str, Tuple[str, ...]] = {
+    "agent_start": _REQUIRED_ATTRIBUTE_PREFIXES,
+    "agent_end": _REQUIRED_ATTRIBUTE_PREFIXES,
+    "llm_call_start": _REQUIRED_ATTRIBUTE_PREFIXES + _LLM_REQUEST_ATTRIBUTE_PREFIXES,
+    "llm_call_end": _REQUIRED_ATTRIBUTE_PREFIXES + ("llm_response.",),
+    "llm_call_error": _REQUIRED_ATTRIBUTE_PREFIXES + _LLM_REQUEST_ATTRIBUTE_PREFIXES + ("error",),
+    "tool_call_start": _REQUIRED_ATTRIBUTE_PREFIXES + _TOOL_CALL_ATTRIBUTE_PREFIXES,
+    "tool_call_end": _REQUIRED_ATTRIBUTE_PREFIXES + _TOOL_CALL_ATTRIBUTE_PREFIXES + ("tool_response.",),
+    "tool_call_error": _REQUIRED_ATTRIBUTE_PREFIXES + _TOOL_CALL_ATTRIBUTE_PREFIXES + ("error",),
+}
+
 
 def _create_communication_event(
     event_type: str,
@@ -101,13 +124,22 @@ def _create_communication_event(
 
 def _extract_attributes(
     attributes: RepeatedCompositeFieldContainer[KeyValue],
+    key_prefixes: Optional[Tuple[str, ...]] = None,
 ) -> Dict[str, Union[str, int, float, bool]]:
-    """Extract all attributes from a span."""
+    """Extract the attributes from a span.
+
+    Args:
+        attributes: The OTEL attributes
+        key_prefixes: Only decode attributes whose key starts with one of these, all if None
+    """
     attrs = {}
     for attr in attributes:
+        key = attr.key
+        if key_prefixes is not None and not key.startswith(key_prefixes):
+            continue
         value = _extract_attribute_value(attr.value)
         if value is not None:
-            attrs[attr.key] = value
+            attrs[key] = value
     return attrs
 
 
@@ -116,25 +148,51 @@ def _extract_resource_attributes(resource: Resource) -> Dict[str, Union[str, int
     return _extract_attributes(resource.attributes)
 
 
+@functools.lru_cache(maxsize=1024)
+def _format_utc_seconds(seconds: int) -> str:
+    """Format whole seconds since the epoch as an ISO 8601 UTC date and time without timezone.
+
+    Spans of one export mostly start within the same few seconds, so the datetime is only built once per second.
+    """
+    dt = datetime.fromtimestamp(seconds, tz=timezone.utc)
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+
+
 def _convert_timestamp_to_iso(timestamp_nano: int, span_name: str) -> Optional[str]:
-    """Convert nanosecond timestamp to ISO format string."""
+    """Convert nanosecond timestamp to ISO format string.
+
+    Integer arithmetic keeps the full microsecond precision that a float division would lose.
+    Like datetime.isoformat(), the fraction is omitted for whole seconds.
+    """
+    seconds, nanoseconds = divmod(timestamp_nano, 1_000_000_000)
     try:
-        datetime_object = datetime.fromtimestamp(timestamp_nano / 1_000_000_000, tz=timezone.utc)
-        return datetime_object.isoformat().replace("+00:00", "Z")
+        date_time = _format_utc_seconds(seconds)
     except (ValueError, OSError, OverflowError) as e:
         logger.warning(f"Invalid timestamp in span '{span_name}': {timestamp_nano}. Error: {e}")
         return None
+    microseconds = nanoseconds // 1000
+    if microseconds:
+        return f"{date_time}.{microseconds:06d}Z"
+    return f"{date_time}Z"
 
 
-def _process_single_span(resource: Resource, span: trace_pb2.Span) -> Optional[CommunicationEvent]:
+def _process_single_span(resource_attributes: Dict[str, Any], span: trace_pb2.Span) -> Optional[CommunicationEvent]:
     """
     Process a single span and return a communication event if valid.
 
     Returns:
         CommunicationEvent or None if span should be skipped
     """
-    span_attributes = _extract_attributes(span.attributes)
-    resource_attributes = _extract_resource_attributes(resource)
+    # Determine event type first, so attributes are only decoded for spans that become events
+    # Read once, every access to a protobuf string field creates a new str
+    span_name = span.name
+    event_type = _determine_event_type(span_name)
+    if not event_type:
+        # Logged once per span, so formatting is left to the logger for when debug logging is enabled
+        logger.debug("Skipping span '%s': unrecognized communication event pattern", span_name)
+        return None
+
+    span_attributes = _extract_attributes(span.attributes, ATTRIBUTE_PREFIX_MAP[event_type])
 
     # Extract required attributes
     conversation_id = span_attributes.get("conversation_id")
@@ -143,19 +201,15 @@ def _process_single_span(resource: Resource, span: trace_pb2.Span) -> Optional[C
 
     if not conversation_id or not agent_name:
         logger.debug(
-            f"Skipping span '{span.name}': missing required attributes "
-            f"(conversation_id: {bool(conversation_id)}, agent_name: {bool(agent_name)})"
+            "Skipping span '%s': missing required attributes (conversation_id: %s, agent_name: %s)",
+            span_name,
+            bool(conversation_id),
+            bool(agent_name),
         )
         return None
 
-    # Determine event type
-    event_type = _determine_event_type(span.name)
-    if not event_type:
-        logger.debug(f"Skipping span '{span.name}': unrecognized communication event pattern")
-        return None
-
     # Convert timestamp
-    iso_timestamp = _convert_timestamp_to_iso(span.start_time_unix_nano, span.name)
+    iso_timestamp = _convert_timestamp_to_iso(span.start_time_unix_nano, span_name)
     if not iso_timestamp:
         return None
 
@@ -164,7 +218,7 @@ def _process_single_span(resource: Resource, span: trace_pb2.Span) -> Optional[C
         event_type, str(agent_name), str(conversation_id), span_attributes, iso_timestamp, resource_attributes
     )
 
-    logger.debug(f"Created {event_type} event for agent '{agent_name}' in conversation '{conversation_id}'")
+    logger.debug("Created %s event for agent '%s' in conversation '%s'", event_type, agent_name, conversation_id)
 
     return event
 
@@ -178,13 +232,17 @@ def preprocess_spans(export_request: trace_service_pb2.ExportTraceServiceRequest
         List of CommunicationEvent objects
     """
     events = []
-    span_count = sum(len(scope.spans) for rs in export_request.resource_spans for scope in rs.scope_spans)
-    logger.debug(f"Processing {span_count} spans for communication events")
+    # Counted while processing instead of walking the nested spans twice
+    span_count = 0
 
     for resource_span in export_request.resource_spans:
+        # Resource attributes are shared by all spans of the resource, so they are decoded once
+        resource_attributes = _extract_resource_attributes(resource_span.resource)
         for instrumentation_scope in resource_span.scope_spans:
-            for span in instrumentation_scope.spans:
-                event = _process_single_span(resource_span.resource, span)
+            spans = instrumentation_scope.spans
+            span_count += len(spans)
+            for span in spans:
+                event = _process_single_span(resource_attributes, span)
                 if event:
                     events.append(event)
 
@@ -1,9 +1,11 @@
 import logging
 import os
+from pathlib import Path
 from typing import Dict
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
+from google.protobuf.internal import api_implementation
 
 from app.api.routes.filters import router as filters_router
 from app.api.routes.traces import router as trace_router
@@ -21,9 +23,16 @@ app = FastAPI(
     description="App for receiving and processing tracing data and sending them out via websocket",
 )
 
-excluded_endpoints = ["/health"]
+excluded_endpoints = frozenset({"/health"})
 logging.getLogger("uvicorn.access").addFilter(EndpointFilter(excluded_endpoints))
 
+# Span parsing is the main CPU cost of trace ingestion and the pure Python protobuf parser is far slower than upb
+if api_implementation.Type() == "python":
+    logging.getLogger(__name__).warning(
+        "Using the pure Python protobuf implementation, trace parsing will be slow. "
+        "Unset PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION or install a protobuf wheel for this platform."
+    )
+
 
 @app.get("/health")
 async def health_check() -> Dict[str, str]:
@@ -35,5 +44,7 @@ app.include_router(filters_router)
 app.include_router(trace_router)
 app.include_router(websocket_router)
 
-# Mount static files with SPA support
-app.mount("/", StaticFiles(directory="./frontend/dist/", html=True, check_dir=False), name="spa")
+# Mount static files with SPA support. The directory is resolved once at import time, relative to the
+# project root instead of the working directory, so file lookups start from an absolute path
+FRONTEND_DIST_DIR = Path(__file__).resolve().parent.parent / "frontend" / "dist"
+app.mount("/", StaticFiles(directory=FRONTEND_DIST_DIR, html=True, check_dir=False), name="spa")
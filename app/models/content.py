@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List, Union
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResponse:
     """
     A class representing a response from a tool call.
@@ -16,7 +16,7 @@ class ToolResponse:
     response: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class TextContent:
     """
     A class representing text content.
@@ -30,7 +30,7 @@ class TextContent:
     thought: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class LlmRequestContent:
     """
     A class representing the content of an LLM request.
@@ -44,7 +44,7 @@ class LlmRequestContent:
     content: List[Union[TextContent, ToolResponse]] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     """
     A class representing a tool call.
@@ -58,7 +58,7 @@ class ToolCall:
     arguments: Dict[str, str] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class LlmResponseContent:
     """
     A class representing the content of an LLM response.
@@ -72,7 +72,7 @@ class LlmResponseContent:
     parts: List[Union[TextContent, ToolCall]] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class UsageMetadata:
     """
     A class representing usage metadata for an LLM call.
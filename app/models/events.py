@@ -1,10 +1,10 @@
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field
 from typing import Any, Dict, Union
 
 from .content import LlmRequestContent, LlmResponseContent, ToolCall, UsageMetadata
 
 
-@dataclass
+@dataclass(slots=True)
 class BaseEvent:
     """
     Base class for all communication events.
@@ -36,17 +36,13 @@ class BaseEvent:
     invocation_id: str = ""
     workforce_name: str | None = None
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert event to JSON-serializable dictionary."""
-        return asdict(self)
 
-
-@dataclass
+@dataclass(slots=True)
 class AgentEvent(BaseEvent):
     """Event fired for agent lifecycle changes (start/end)."""
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMCallStartEvent(BaseEvent):
     """
     Event fired when an LLM call begins.
@@ -60,7 +56,7 @@ class LLMCallStartEvent(BaseEvent):
     content: LlmRequestContent = field(default_factory=LlmRequestContent)
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMCallEndEvent(BaseEvent):
     """
     Event fired when an LLM call completes.
@@ -74,7 +70,7 @@ class LLMCallEndEvent(BaseEvent):
     usage_metadata: UsageMetadata = field(default_factory=UsageMetadata)
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMCallErrorEvent(BaseEvent):
     """
     Event fired when an LLM call encounters an error.
@@ -90,7 +86,7 @@ class LLMCallErrorEvent(BaseEvent):
     error: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCallStartEvent(BaseEvent):
     """
     Event fired when a tool call begins.
@@ -102,7 +98,7 @@ class ToolCallStartEvent(BaseEvent):
     tool_call: ToolCall = field(default_factory=ToolCall)
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCallErrorEvent(BaseEvent):
     """
     Event fired when a tool call encounters an error.
@@ -116,7 +112,7 @@ class ToolCallErrorEvent(BaseEvent):
     error: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class InvokeAgentStartEvent(ToolCallStartEvent):
     """
     Event fired when an agent is invoked by a tool call.
@@ -128,7 +124,7 @@ class InvokeAgentStartEvent(ToolCallStartEvent):
     invoked_agent: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCallEndEvent(BaseEvent):
     """
     Event fired when a tool call completes.
@@ -142,7 +138,7 @@ class ToolCallEndEvent(BaseEvent):
     response: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class InvokeAgentEndEvent(ToolCallEndEvent):
     """
     Event fired when an agent invocation by a tool call ends.
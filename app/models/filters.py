@@ -1,11 +1,11 @@
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Dict, Optional
+from typing import TYPE_CHECKING, Callable, ClassVar, Mapping, Optional
 
 if TYPE_CHECKING:
     from .events import CommunicationEvent
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FilterCriteria:
     """
     Filter criteria for WebSocket connections.
@@ -13,8 +13,12 @@ class FilterCriteria:
     Each field can be:
     - None: Match all values (no filtering on this field)
     - Specific value: Only match events with this exact value
+
+    Instances are immutable, so the filter matching everything is shared as FilterCriteria.EMPTY.
     """
 
+    EMPTY: ClassVar["FilterCriteria"]
+
     conversation_id: Optional[str] = None
     workforce: Optional[str] = None
     # Easy to extend with more fields later:
@@ -43,23 +47,44 @@ class FilterCriteria:
 
         return True
 
+    def compile(self) -> Callable[["CommunicationEvent"], bool]:
+        """
+        Create a predicate equivalent to matches() that is specialized for the set fields.
+
+        The filter values are bound once, so checking an event skips the per-field None checks.
+
+        Returns:
+            Function returning True if an event matches this filter criteria
+        """
+        conversation_id = self.conversation_id
+        workforce = self.workforce
+
+        if conversation_id is None and workforce is None:
+            return lambda event: True
+        if workforce is None:
+            return lambda event: event.conversation_id == conversation_id
+        if conversation_id is None:
+            return lambda event: event.workforce_name == workforce
+        return lambda event: event.conversation_id == conversation_id and event.workforce_name == workforce
+
     @classmethod
-    def from_query_params(cls, params: Dict[str, str]) -> "FilterCriteria":
+    def from_query_params(cls, params: Mapping[str, str]) -> "FilterCriteria":
         """
         Parse filter criteria from WebSocket query parameters.
 
+        Accepts the request's QueryParams directly, only the filter keys are read.
+
         Example: /ws?conversation_id=abc-123&workforce=foo
         """
-        return cls(
-            conversation_id=params.get("conversation_id"),
-            workforce=params.get("workforce"),
-        )
+        conversation_id = params.get("conversation_id")
+        workforce = params.get("workforce")
+        if conversation_id is None and workforce is None:
+            return cls.EMPTY
+        return cls(conversation_id=conversation_id, workforce=workforce)
 
     def is_empty(self) -> bool:
         """Check if this filter matches everything (all fields are None)"""
-        return all(
-            [
-                self.conversation_id is None,
-                self.workforce is None,
-            ]
-        )
+        return self.conversation_id is None and self.workforce is None
+
+
+FilterCriteria.EMPTY = FilterCriteria()
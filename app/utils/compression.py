@@ -0,0 +1,38 @@
+import gzip
+import struct
+
+import deflate
+
+# CRC32 and ISIZE fields that end every gzip member, both little-endian
+_GZIP_TRAILER = struct.Struct("<II")
+
+
+def gzip_decompress(data: bytes) -> bytes:
+    """
+    Decompress a complete gzip buffer.
+
+    OTLP/HTTP exporters send one gzip member per request, so the whole body can be inflated
+    in a single libdeflate call, which is considerably faster than zlib's streaming inflate.
+    libdeflate only decodes the first member and does not report how much input it consumed,
+    so its output is only used when that member provably spans the whole body. libdeflate
+    verifies the output against the trailer of the member it decoded, so the member ends at
+    the first occurrence of that trailer; if this is not the end of the body (concatenated
+    members, trailing padding or garbage), the stdlib implementation handles the body instead.
+
+    Args:
+        data: The gzip compressed request body
+
+    Returns:
+        The decompressed bytes
+    """
+    try:
+        decompressed = deflate.gzip_decompress(data)
+    except deflate.DeflateError:
+        return gzip.decompress(data)
+
+    # Empty output is not verified against a trailer, e.g. for bodies ending in zero padding
+    if decompressed:
+        trailer = _GZIP_TRAILER.pack(deflate.crc32(decompressed), len(decompressed) & 0xFFFFFFFF)
+        if data.find(trailer) == len(data) - _GZIP_TRAILER.size:
+            return bytes(decompressed)
+    return gzip.decompress(data)
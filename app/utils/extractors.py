@@ -1,6 +1,6 @@
+import functools
 import logging
-import re
-from typing import Any, Dict, Optional
+from typing import Any, Collection, Dict, Optional
 
 from ..models.content import (
     LlmRequestContent,
@@ -14,22 +14,52 @@ from ..models.content import (
 logger = logging.getLogger(__name__)
 
 # Supported LLM content sub-parts from Google GenAI Content types
-SUPPORTED_CONTENT_PARTS = {
-    "text",
-    "function_call",
-    "video_metadata",
-    "inline_data",
-    "file_data",
-    "code_execution_result",
-    "executable_code",
-    "function_response",
-}
-
-# Compiled regex patterns for better performance
-_PATTERN_TEXT_LLM_REQUEST = re.compile(r"user_content\.parts\.\d+\.text")
-_PATTERN_FUNCTION_RESPONSE_LLM_REQUEST = re.compile(r"user_content\.parts\.(\d+)\.function_response\.name")
-_PATTERN_TEXT_LLM_RESPONSE = re.compile(r"llm_response\.content\.parts\.\d+\.text")
-_PATTERN_FUNCTION_CALL_LLM_RESPONSE = re.compile(r"llm_response\.content\.parts\.(\d+)\.function_call\.name")
+SUPPORTED_CONTENT_PARTS = frozenset(
+    {
+        "text",
+        "function_call",
+        "video_metadata",
+        "inline_data",
+        "file_data",
+        "code_execution_result",
+        "executable_code",
+        "function_response",
+    }
+)
+
+# Key prefixes of numbered LLM content parts, e.g. user_content.parts.0.text
+_USER_CONTENT_PARTS_PREFIX = "user_content.parts."
+_LLM_REQUEST_PARTS_PREFIX = "llm_request.content.parts."
+_LLM_RESPONSE_PARTS_PREFIX = "llm_response.content.parts."
+_FUNCTION_RESPONSE_FIELD_PREFIX = "function_response.response."
+_FUNCTION_CALL_ARGS_PREFIX = "function_call.args."
+# Lengths for stripping the prefixes with a single slice comparison and slice
+_FUNCTION_RESPONSE_FIELD_PREFIX_LENGTH = len(_FUNCTION_RESPONSE_FIELD_PREFIX)
+_FUNCTION_CALL_ARGS_PREFIX_LENGTH = len(_FUNCTION_CALL_ARGS_PREFIX)
+
+# Reported by every LLM response that carries usage metadata
+_USAGE_METADATA_TOTAL_KEY = "llm_response.usage_metadata.total_token_count"
+
+# Attribute namespaces read by the tool call extractors
+TOOL_NAMESPACES = ("args", "tool_response")
+
+
+def group_attributes(attributes: Dict[str, Any], namespaces: Collection[str]) -> Dict[str, Dict[str, Any]]:
+    """Group attributes by the first segment of their key in a single pass.
+
+    For example "args.city" is stored as "city" in the "args" group. Keys of other namespaces
+    and keys without a remainder after the namespace are skipped.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The attributes of each requested namespace, keyed by the remainder of their key.
+    """
+    groups: Dict[str, Dict[str, Any]] = {namespace: {} for namespace in namespaces}
+    for key, value in attributes.items():
+        namespace, _, rest = key.partition(".")
+        group = groups.get(namespace)
+        if group is not None and rest:
+            group[rest] = value
+    return groups
 
 
 def extract_invoked_agent(attributes: Dict[str, Any]) -> str:
@@ -46,75 +76,96 @@ def extract_invoked_agent(attributes: Dict[str, Any]) -> str:
     return str(attributes.get("tool_name", ""))
 
 
-def extract_tool_response(attributes: Dict[str, Any]) -> Dict[str, Any]:
-    """Extract tool response from attributes."""
-    try:
-        response = {}
-        for key, value in attributes.items():
-            if key.startswith("tool_response."):
-                key_parts = key.split(".")
-                if len(key_parts) > 1:
-                    new_key = key_parts[-1]
-                    if new_key:
-                        response[new_key] = value
-        return response
-    except (AttributeError, TypeError, IndexError) as e:
-        logger.exception(f"Error extracting tool response: {e}")
-        return {}
+def extract_tool_response(
+    attributes: Dict[str, Any], groups: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Extract tool response from attributes.
+
+    Args:
+        attributes: The span attributes
+        groups: The attributes grouped by TOOL_NAMESPACES, grouped here if not given
+    """
+    if groups is None:
+        groups = group_attributes(attributes, TOOL_NAMESPACES)
+    response = {}
+    for key, value in groups["tool_response"].items():
+        new_key = key.rpartition(".")[2]
+        if new_key:
+            response[new_key] = value
+    return response
 
 
+@functools.lru_cache(maxsize=4096)
 def parse_llm_content_key(key: str) -> Optional[tuple[str, str]]:
     """Parse LLM content key to extract prefix and origin part.
 
+    Spans of the same model repeat the same key shapes, so results are cached per key.
+
+    For example "llm_request.content.parts.0.text" is parsed into ("llm_request.content.parts.0", "text").
+
     Returns:
         Optional[tuple[str, str]]: Tuple of (prefix, origin) if valid, None otherwise.
     """
-    try:
-        key_parts = key.split(".")
-        if "parts" not in key_parts:
-            return None
+    # Leading dot, so a key starting with the parts segment is found by the same search
+    head, separator, rest = ("." + key).partition(".parts.")
+    if not separator:
+        return None
+
+    number, _, fields = rest.partition(".")
+    origin = fields.partition(".")[0]
+    if not fields or origin not in SUPPORTED_CONTENT_PARTS:
+        return None
 
-        parts_index = key_parts.index("parts")
-        origin_index = parts_index + 2
+    # Drop the leading dot again
+    return f"{head}.parts.{number}"[1:], origin
 
-        if origin_index >= len(key_parts):
-            return None
 
-        origin = key_parts[origin_index]
-        if origin not in SUPPORTED_CONTENT_PARTS:
-            return None
+def _split_part_key(key: str, prefix: str) -> Optional[tuple[str, str]]:
+    """Split a numbered content part key such as prefix + "0.text" into its part number and field.
 
-        prefix = ".".join(key_parts[:origin_index])
-        return prefix, origin
-    except (ValueError, IndexError):
+    Returns:
+        Optional[tuple[str, str]]: Tuple of (number, field) if the key is a part key, None otherwise.
+    """
+    if not key.startswith(prefix):
+        return None
+    number, _, field = key[len(prefix) :].partition(".")
+    if not number.isdecimal():
         return None
+    return number, field
 
 
 def extract_llm_request_content(attributes: Dict[str, Any]) -> LlmRequestContent:
-    """Extract LLM request content from attributes."""
+    """Extract LLM request content from attributes.
+
+    The attributes are scanned once, with function response fields collected per part number
+    and attached to their tool responses afterwards.
+    """
     try:
         content = LlmRequestContent()
         tool_responses = {}  # Store ToolResponse objects by number
+        response_fields: Dict[str, Dict[str, Any]] = {}  # Store function response fields by number
         for key, value in attributes.items():
-            if not key.startswith("user_content."):
-                continue
-            if _PATTERN_TEXT_LLM_REQUEST.fullmatch(key):
-                content.content.append(TextContent(text=value, thought=False))
+            if key.startswith("user_content."):
+                part = _split_part_key(key, _USER_CONTENT_PARTS_PREFIX)
+                if part is not None and part[1] == "text":
+                    content.content.append(TextContent(text=value, thought=False))
+                    continue
+                if part is not None and part[1] == "function_response.name":
+                    tool_responses[part[0]] = ToolResponse(tool_name=value, response={})
+                    continue
+                if key.endswith(".role"):
+                    content.role = value
                 continue
-            match_func = _PATTERN_FUNCTION_RESPONSE_LLM_REQUEST.fullmatch(key)
-            if match_func:
-                number = match_func.group(1)
-                tool_responses[number] = ToolResponse(tool_name=value, response={})
+            part = _split_part_key(key, _LLM_REQUEST_PARTS_PREFIX)
+            if part is None:
                 continue
-            if key.endswith(".role"):
-                content.role = value
+            field = part[1]
+            if field[:_FUNCTION_RESPONSE_FIELD_PREFIX_LENGTH] == _FUNCTION_RESPONSE_FIELD_PREFIX:
+                new_key = field[_FUNCTION_RESPONSE_FIELD_PREFIX_LENGTH:]
+                if new_key:
+                    response_fields.setdefault(part[0], {})[new_key] = value
         for number, tool_response in tool_responses.items():
-            prefix = f"llm_request.content.parts.{number}.function_response.response."
-            for sub_key, sub_value in attributes.items():
-                if sub_key.startswith(prefix):
-                    new_key = sub_key.removeprefix(prefix)
-                    if new_key:
-                        tool_response.response[new_key] = sub_value
+            tool_response.response.update(response_fields.get(number, {}))
             content.content.append(tool_response)
         return content
     except (AttributeError, TypeError) as e:
@@ -123,33 +174,37 @@ def extract_llm_request_content(attributes: Dict[str, Any]) -> LlmRequestContent
 
 
 def extract_llm_response_content(attributes: Dict[str, Any]) -> LlmResponseContent:
-    """Extract LLM response content from attributes."""
+    """Extract LLM response content from attributes.
+
+    The attributes are scanned once, with function call arguments collected per part number
+    and attached to their tool calls afterwards.
+    """
     try:
         content = None
         tool_calls = {}  # Store ToolCall objects by number
+        call_arguments: Dict[str, Dict[str, Any]] = {}  # Store function call arguments by number
         for key, value in attributes.items():
             if not key.startswith("llm_response.content."):
                 continue
             if content is None:
                 content = LlmResponseContent()
-            if _PATTERN_TEXT_LLM_RESPONSE.fullmatch(key):
-                thought = attributes.get(key.replace("text", "thought"), False)
-                content.parts.append(TextContent(text=value, thought=thought))
-                continue
-            match_func = _PATTERN_FUNCTION_CALL_LLM_RESPONSE.fullmatch(key)
-            if match_func:
-                number = match_func.group(1)
-                tool_calls[number] = ToolCall(tool_name=value)
-                continue
+            part = _split_part_key(key, _LLM_RESPONSE_PARTS_PREFIX)
+            if part is not None:
+                if part[1] == "text":
+                    thought = attributes.get(key.replace("text", "thought"), False)
+                    content.parts.append(TextContent(text=value, thought=thought))
+                    continue
+                if part[1] == "function_call.name":
+                    tool_calls[part[0]] = ToolCall(tool_name=value)
+                    continue
+                if part[1][:_FUNCTION_CALL_ARGS_PREFIX_LENGTH] == _FUNCTION_CALL_ARGS_PREFIX:
+                    new_key = part[1][_FUNCTION_CALL_ARGS_PREFIX_LENGTH:]
+                    if new_key:
+                        call_arguments.setdefault(part[0], {})[new_key] = value
             if key.endswith(".role"):
                 content.role = value
         for number, tool_call in tool_calls.items():
-            prefix = f"llm_response.content.parts.{number}.function_call.args."
-            for sub_key, sub_value in attributes.items():
-                if sub_key.startswith(prefix):
-                    new_key = sub_key.removeprefix(prefix)
-                    if new_key:
-                        tool_call.arguments[new_key] = sub_value
+            tool_call.arguments.update(call_arguments.get(number, {}))
             if content:
                 content.parts.append(tool_call)
         return content if content is not None else LlmResponseContent()
@@ -159,32 +214,32 @@ def extract_llm_response_content(attributes: Dict[str, Any]) -> LlmResponseConte
 
 
 def extract_usage_metadata(attributes: Dict[str, Any]) -> UsageMetadata:
-    """Extract usage metadata from attributes."""
-    try:
-        return UsageMetadata(
-            total_tokens=attributes.get("llm_response.usage_metadata.total_token_count", 0),
-            prompt_tokens=attributes.get("llm_response.usage_metadata.prompt_token_count", 0),
-            candidate_tokens=attributes.get("llm_response.usage_metadata.candidates_token_count", 0),
-            thoughts_tokens=attributes.get("llm_response.usage_metadata.thoughts_token_count", 0),
-            tool_use_prompt_tokens=attributes.get("llm_response.usage_metadata.tool_use_prompt_token_count", 0),
-            cached_content_tokens=attributes.get("llm_response.usage_metadata.cached_content_token_count", 0),
-        )
-    except (AttributeError, TypeError) as e:
-        logger.exception(f"Error extracting usage metadata: {e}")
-        return UsageMetadata()
-
+    """Extract usage metadata from attributes.
 
-def extract_tool_call(attributes: Dict[str, Any]) -> ToolCall:
-    """Extract tool call from attributes."""
-    try:
-        tool_name = attributes.get("tool_name", "")
-        arguments = {}
-        for key, value in attributes.items():
-            if key.startswith("args."):
-                new_key = key.removeprefix("args.")
-                if new_key:
-                    arguments[new_key] = value
-        return ToolCall(tool_name=tool_name, arguments=arguments)
-    except (AttributeError, TypeError) as e:
-        logger.exception(f"Error extracting tool call: {e}")
-        return ToolCall()
+    Responses without a total token count carry no usage metadata at all, so they are
+    answered with a single lookup instead of one per counter.
+    """
+    total_tokens = attributes.get(_USAGE_METADATA_TOTAL_KEY)
+    if total_tokens is None:
+        return UsageMetadata()
+    return UsageMetadata(
+        total_tokens=total_tokens,
+        prompt_tokens=attributes.get("llm_response.usage_metadata.prompt_token_count", 0),
+        candidate_tokens=attributes.get("llm_response.usage_metadata.candidates_token_count", 0),
+        thoughts_tokens=attributes.get("llm_response.usage_metadata.thoughts_token_count", 0),
+        tool_use_prompt_tokens=attributes.get("llm_response.usage_metadata.tool_use_prompt_token_count", 0),
+        cached_content_tokens=attributes.get("llm_response.usage_metadata.cached_content_token_count", 0),
+    )
+
+
+def extract_tool_call(attributes: Dict[str, Any], groups: Optional[Dict[str, Dict[str, Any]]] = None) -> ToolCall:
+    """Extract tool call from attributes.
+
+    Args:
+        attributes: The span attributes
+        groups: The attributes grouped by TOOL_NAMESPACES, grouped here if not given
+    """
+    if groups is None:
+        groups = group_attributes(attributes, TOOL_NAMESPACES)
+    tool_name = attributes.get("tool_name", "")
+    return ToolCall(tool_name=tool_name, arguments=groups["args"])
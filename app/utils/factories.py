@@ -1,7 +1,9 @@
-import json
 import logging
 from typing import Any, Dict
 
+import orjson
+
+from ..models.content import ToolCall
 from ..models.events import (
     AgentEvent,
     InvokeAgentEndEvent,
@@ -14,12 +16,14 @@ from ..models.events import (
     ToolCallStartEvent,
 )
 from .extractors import (
+    TOOL_NAMESPACES,
     extract_invoked_agent,
     extract_llm_request_content,
     extract_llm_response_content,
     extract_tool_call,
     extract_tool_response,
     extract_usage_metadata,
+    group_attributes,
 )
 
 logger = logging.getLogger(__name__)
@@ -117,22 +121,20 @@ def create_llm_call_end_event(
     )
 
 
-def _is_agent_tool_call(attributes: Dict[str, Any]) -> bool:
+def _is_agent_tool_call(tool_call: ToolCall) -> bool:
     """Check if the tool call is an agent invocation.
 
     Uses a heuristic based on argument patterns:
     - AgentTool calls (sub-agent invocations) have only 'args.request' as their argument
     - transfer_to_agent is an explicit agent transfer method
+
+    Works on the already grouped arguments, so the span attributes are not scanned again.
     """
-    if attributes.get("tool_name") == "transfer_to_agent":
+    if tool_call.tool_name == "transfer_to_agent":
         return True
 
     # AgentTool heuristic: only has args.request, no other args
-    args_keys = [k for k in attributes if k.startswith("args.")]
-    if args_keys == ["args.request"]:
-        return True
-
-    return False
+    return len(tool_call.arguments) == 1 and "request" in tool_call.arguments
 
 
 def create_tool_call_start_event(
@@ -144,10 +146,10 @@ def create_tool_call_start_event(
 ) -> ToolCallStartEvent:
     """Create a ToolCallStartEvent from span attributes."""
     invocation_id = attributes.get("invocation_id", "")
-    tool_call = extract_tool_call(attributes)
+    tool_call = extract_tool_call(attributes, group_attributes(attributes, TOOL_NAMESPACES))
     workforce_name = _extract_workforce_name(resource_attributes)
 
-    if _is_agent_tool_call(attributes):
+    if _is_agent_tool_call(tool_call):
         return InvokeAgentStartEvent(
             acting_agent=acting_agent,
             conversation_id=conversation_id,
@@ -219,18 +221,21 @@ def create_tool_call_end_event(
 ) -> ToolCallEndEvent:
     """Create a ToolCallEndEvent from span attributes."""
     invocation_id = attributes.get("invocation_id", "")
-    tool_call = extract_tool_call(attributes)
-    response = extract_tool_response(attributes)
+    # Group the attributes once for both extractors instead of scanning them twice
+    groups = group_attributes(attributes, TOOL_NAMESPACES)
+    tool_call = extract_tool_call(attributes, groups)
+    response = extract_tool_response(attributes, groups)
     workforce_name = _extract_workforce_name(resource_attributes)
 
     if response is not None:
-        if isinstance(response.get("text"), str):
+        text = response.get("text")
+        # Only texts that look like a JSON object or array are parsed, plain texts are kept as is
+        if isinstance(text, str) and text.lstrip()[:1] in ("{", "["):
             try:
-                response["text"] = json.loads(response["text"])
-            except json.JSONDecodeError:
-                logger.debug("Failed to parse tool response text as JSON: %s", response["text"], exc_info=True)
-                pass
-    if _is_agent_tool_call(attributes):
+                response["text"] = orjson.loads(text)
+            except orjson.JSONDecodeError:
+                logger.debug("Failed to parse tool response text as JSON: %s", text, exc_info=True)
+    if _is_agent_tool_call(tool_call):
         return InvokeAgentEndEvent(
             acting_agent=acting_agent,
             conversation_id=conversation_id,
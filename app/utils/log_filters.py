@@ -1,18 +1,20 @@
 import logging
+from typing import Iterable
 
 
 class EndpointFilter(logging.Filter):
     """Filter class to exclude specific endpoints from log entries."""
 
-    def __init__(self, excluded_endpoints: list[str]) -> None:
+    def __init__(self, excluded_endpoints: Iterable[str]) -> None:
         """
         Initialize the EndpointFilter class.
 
         Args:
-            excluded_endpoints: A list of endpoints to be excluded from log entries.
+            excluded_endpoints: The endpoints to be excluded from log entries.
+                Stored as a frozenset, so every access log record is checked in constant time.
         """
         super().__init__()
-        self.excluded_endpoints = excluded_endpoints
+        self.excluded_endpoints = frozenset(excluded_endpoints)
 
     def filter(self, record: logging.LogRecord) -> bool:
         """
@@ -42,4 +44,4 @@ class EndpointFilter(logging.Filter):
 
         # 4. Now that all checks have passed, perform the actual filtering.
         # This logic now safely returns a boolean.
-        return False
+        return endpoint not in self.excluded_endpoints
@@ -16,14 +16,14 @@ export function DashboardCanvas({ websocketUrl }: DashboardCanvasProps) {
     const [commandHistory, setCommandHistory] = useState<Command[]>([]);
     const [graphState, setGraphState] = useState<GraphState>(new GraphState());
 
-    const command = useWebSocketCommands(websocketUrl);
+    const commands = useWebSocketCommands(websocketUrl);
 
     // Effect to handle incoming commands
     useEffect(() => {
-        if (!command) return;
+        if (commands.length === 0) return;
 
-        setCommandHistory(prev => [...prev, command]);
-    }, [command]);
+        setCommandHistory(prev => [...prev, ...commands]);
+    }, [commands]);
 
     useEffect(() => {
         if (commandHistory.length === 0) return;
@@ -1,7 +1,7 @@
 import { renderHook } from '@testing-library/react';
 import { vi, describe, it, expect, beforeEach } from 'vitest';
 import useWebSocket, { ReadyState } from 'react-use-websocket';
-import { useWebSocketCommands } from './useWebSocketCommands';
+import { decodeMessage, useWebSocketCommands } from './useWebSocketCommands';
 import { createCommandFromEvent } from '@/lib/commandFactory';
 import { CommunicationEvent } from '@/model/events';
 
@@ -11,13 +11,17 @@ vi.mock('@/lib/commandFactory');
 
 // Helper type for mocking useWebSocket return value
 type MockWebSocketReturn = {
-    lastJsonMessage: CommunicationEvent | null;
+    lastMessage: MessageEvent | null;
     sendMessage: ReturnType<typeof vi.fn>;
     sendJsonMessage: ReturnType<typeof vi.fn>;
     readyState: ReadyState;
     getWebSocket: ReturnType<typeof vi.fn>;
 };
 
+// Events are delivered in batches as binary frames containing UTF-8 encoded JSON
+const toBinaryMessage = (...events: CommunicationEvent[]): MessageEvent =>
+    ({ data: new TextEncoder().encode(JSON.stringify({ type: 'batch', events })).buffer }) as MessageEvent;
+
 describe('useWebSocketCommands', () => {
     const mockUrl = 'ws://localhost:10005/ws';
     const mockCreateCommandFromEvent = vi.mocked(createCommandFromEvent);
@@ -27,9 +31,9 @@ describe('useWebSocketCommands', () => {
         vi.clearAllMocks();
     });
 
-    it('should return null when no message is received', () => {
+    it('should return no commands when no message is received', () => {
         mockUseWebSocket.mockReturnValue({
-            lastJsonMessage: null,
+            lastMessage: null,
             sendMessage: vi.fn(),
             sendJsonMessage: vi.fn(),
             readyState: ReadyState.OPEN,
@@ -38,7 +42,7 @@ describe('useWebSocketCommands', () => {
 
         const { result } = renderHook(() => useWebSocketCommands(mockUrl));
 
-        expect(result.current).toBeNull();
+        expect(result.current).toEqual([]);
         expect(mockCreateCommandFromEvent).not.toHaveBeenCalled();
     });
 
@@ -57,7 +61,7 @@ describe('useWebSocketCommands', () => {
         };
 
         mockUseWebSocket.mockReturnValue({
-            lastJsonMessage: mockMessage,
+            lastMessage: toBinaryMessage(mockMessage),
             sendMessage: vi.fn(),
             sendJsonMessage: vi.fn(),
             readyState: ReadyState.OPEN,
@@ -69,7 +73,7 @@ describe('useWebSocketCommands', () => {
         const { result } = renderHook(() => useWebSocketCommands(mockUrl));
 
         expect(mockCreateCommandFromEvent).toHaveBeenCalledWith(mockMessage);
-        expect(result.current).toBe(mockCommand);
+        expect(result.current).toEqual([mockCommand]);
     });
 
     it('should handle null command from createCommandFromEvent', () => {
@@ -82,7 +86,7 @@ describe('useWebSocketCommands', () => {
         } as CommunicationEvent;
 
         mockUseWebSocket.mockReturnValue({
-            lastJsonMessage: mockMessage,
+            lastMessage: toBinaryMessage(mockMessage),
             sendMessage: vi.fn(),
             sendJsonMessage: vi.fn(),
             readyState: ReadyState.OPEN,
@@ -94,7 +98,7 @@ describe('useWebSocketCommands', () => {
         const { result } = renderHook(() => useWebSocketCommands(mockUrl));
 
         expect(mockCreateCommandFromEvent).toHaveBeenCalledWith(mockMessage);
-        expect(result.current).toBeNull();
+        expect(result.current).toEqual([]);
     });
 
     it('should update command when new message is received', () => {
@@ -119,7 +123,7 @@ describe('useWebSocketCommands', () => {
 
         // First render with first message
         mockUseWebSocket.mockReturnValue({
-            lastJsonMessage: firstMessage,
+            lastMessage: toBinaryMessage(firstMessage),
             sendMessage: vi.fn(),
             sendJsonMessage: vi.fn(),
             readyState: ReadyState.OPEN,
@@ -130,11 +134,11 @@ describe('useWebSocketCommands', () => {
 
         const { result, rerender } = renderHook(() => useWebSocketCommands(mockUrl));
 
-        expect(result.current).toBe(firstCommand);
+        expect(result.current).toEqual([firstCommand]);
 
         // Update with second message
         mockUseWebSocket.mockReturnValue({
-            lastJsonMessage: secondMessage,
+            lastMessage: toBinaryMessage(secondMessage),
             sendMessage: vi.fn(),
             sendJsonMessage: vi.fn(),
             readyState: ReadyState.OPEN,
@@ -145,7 +149,7 @@ describe('useWebSocketCommands', () => {
 
         rerender();
 
-        expect(result.current).toBe(secondCommand);
+        expect(result.current).toEqual([secondCommand]);
         expect(mockCreateCommandFromEvent).toHaveBeenCalledWith(secondMessage);
     });
 
@@ -164,7 +168,7 @@ describe('useWebSocketCommands', () => {
         };
 
         mockUseWebSocket.mockReturnValue({
-            lastJsonMessage: mockMessage,
+            lastMessage: toBinaryMessage(mockMessage),
             sendMessage: vi.fn(),
             sendJsonMessage: vi.fn(),
             readyState: ReadyState.OPEN,
@@ -188,11 +192,48 @@ describe('useWebSocketCommands', () => {
         expect(mockCreateCommandFromEvent).toHaveBeenCalledTimes(1);
     });
 
+    it('should create a command for each event in a batch', () => {
+        const firstMessage: CommunicationEvent = {
+            event_type: 'agent_start',
+            acting_agent: 'agent-1',
+            conversation_id: 'conv-123',
+            timestamp: '2024-01-01T00:00:00Z',
+            invocation_id: 'inv-123',
+        };
+
+        const secondMessage: CommunicationEvent = {
+            event_type: 'agent_end',
+            acting_agent: 'agent-1',
+            conversation_id: 'conv-123',
+            timestamp: '2024-01-01T00:00:01Z',
+            invocation_id: 'inv-123',
+        };
+
+        const firstCommand = { type: 'agent_start', execute: vi.fn() };
+        const secondCommand = { type: 'agent_end', execute: vi.fn() };
+
+        mockUseWebSocket.mockReturnValue({
+            lastMessage: toBinaryMessage(firstMessage, secondMessage),
+            sendMessage: vi.fn(),
+            sendJsonMessage: vi.fn(),
+            readyState: ReadyState.OPEN,
+            getWebSocket: vi.fn(),
+        } as MockWebSocketReturn);
+
+        mockCreateCommandFromEvent.mockReturnValueOnce(firstCommand).mockReturnValueOnce(secondCommand);
+
+        const { result } = renderHook(() => useWebSocketCommands(mockUrl));
+
+        expect(mockCreateCommandFromEvent).toHaveBeenNthCalledWith(1, firstMessage);
+        expect(mockCreateCommandFromEvent).toHaveBeenNthCalledWith(2, secondMessage);
+        expect(result.current).toEqual([firstCommand, secondCommand]);
+    });
+
     it('should connect to the correct WebSocket URL', () => {
         const customUrl = 'wss://custom.example.com/ws';
 
         mockUseWebSocket.mockReturnValue({
-            lastJsonMessage: null,
+            lastMessage: null,
             sendMessage: vi.fn(),
             sendJsonMessage: vi.fn(),
             readyState: ReadyState.OPEN,
@@ -201,6 +242,24 @@ describe('useWebSocketCommands', () => {
 
         renderHook(() => useWebSocketCommands(customUrl));
 
-        expect(mockUseWebSocket).toHaveBeenCalledWith(customUrl);
+        expect(mockUseWebSocket).toHaveBeenCalledWith(customUrl, { onOpen: expect.any(Function) });
+    });
+});
+
+describe('decodeMessage', () => {
+    const event: CommunicationEvent = {
+        event_type: 'agent_start',
+        acting_agent: 'test-agent',
+        conversation_id: 'conv-123',
+        timestamp: '2024-01-01T00:00:00Z',
+        invocation_id: 'inv-123',
+    };
+
+    it('should decode batches from binary frames', () => {
+        expect(decodeMessage(toBinaryMessage(event, event).data)).toEqual([event, event]);
+    });
+
+    it('should decode text frames', () => {
+        expect(decodeMessage(JSON.stringify(event))).toEqual([event]);
     });
 });
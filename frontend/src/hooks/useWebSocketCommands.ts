@@ -1,13 +1,28 @@
 import {useMemo} from 'react';
 import useWebSocket from 'react-use-websocket';
 import {CommunicationEvent} from '@/model/events';
+import {Command} from '@/model/command';
 import {createCommandFromEvent} from '@/lib/commandFactory.ts';
 
+const textDecoder = new TextDecoder();
+
+// Messages arrive as binary frames containing UTF-8 encoded JSON, with events grouped into batches
+export const decodeMessage = (data: string | ArrayBuffer): CommunicationEvent[] => {
+    const message = JSON.parse(typeof data === 'string' ? data : textDecoder.decode(data));
+    return message.type === 'batch' ? message.events : [message];
+};
+
+const receiveArrayBuffers = (event: WebSocketEventMap['open']) => {
+    (event.target as WebSocket).binaryType = 'arraybuffer';
+};
+
 export function useWebSocketCommands(url: string) {
-    const { lastJsonMessage } = useWebSocket<CommunicationEvent>(url);
+    const { lastMessage } = useWebSocket(url, { onOpen: receiveArrayBuffers });
     return useMemo(() => {
-        if (!lastJsonMessage) return null;
+        if (!lastMessage) return [];
 
-        return createCommandFromEvent(lastJsonMessage);
-    }, [lastJsonMessage]);
-}
\ No newline at end of file
+        return decodeMessage(lastMessage.data)
+            .map(event => createCommandFromEvent(event))
+            .filter((command): command is Command => command !== null);
+    }, [lastMessage]);
+}
@@ -0,0 +1,101 @@
+"""Fixtures shared by the test modules."""
+
+import struct
+from typing import Any, Dict, Iterator, Sequence
+
+import pytest
+from fastapi.testclient import TestClient
+from opentelemetry.proto.collector.trace.v1 import trace_service_pb2
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+from app.main import app
+
+# AnyValue field for each attribute type, keyed by exact type so bools are not taken for ints.
+# Other types are sent as strings
+VALUE_FIELDS: Dict[type, str] = {str: "string_value", bool: "bool_value", int: "int_value"}
+
+# Big-endian layouts of the 8 byte span ID and the 16 byte trace ID, packed as two halves
+SPAN_ID = struct.Struct(">Q")
+TRACE_ID = struct.Struct(">QQ")
+
+
+class TestClientExporter(SpanExporter):
+    """Span exporter that posts the spans to the trace endpoint of a test client as OTLP protobuf."""
+
+    # Not a test class, despite the name
+    __test__ = False
+
+    def __init__(self, client: TestClient, resource_attributes: Dict[str, str]) -> None:
+        self.client = client
+        self.resource_attributes = resource_attributes
+
+    def export(self, spans: Sequence[Any]) -> SpanExportResult:
+        # Only spans with a conversation_id can become events
+        relevant_spans = [span for span in spans if span.attributes and "conversation_id" in span.attributes]
+        if relevant_spans:
+            request = trace_service_pb2.ExportTraceServiceRequest()
+            resource_spans = request.resource_spans.add()
+            scope_spans = resource_spans.scope_spans.add()
+
+            for key, value in self.resource_attributes.items():
+                resource_attr = resource_spans.resource.attributes.add()
+                resource_attr.key = key
+                resource_attr.value.string_value = value
+
+            for span in relevant_spans:
+                otlp_span = scope_spans.spans.add()
+                otlp_span.name = span.name
+                otlp_span.span_id = SPAN_ID.pack(span.context.span_id)
+                trace_id = span.context.trace_id
+                otlp_span.trace_id = TRACE_ID.pack(trace_id >> 64, trace_id & 0xFFFFFFFFFFFFFFFF)
+                otlp_span.start_time_unix_nano = span.start_time or 0
+                otlp_span.end_time_unix_nano = span.end_time or span.start_time or 0
+
+                for key, value in span.attributes.items():
+                    kv_pair = otlp_span.attributes.add()
+                    kv_pair.key = key
+                    value_field = VALUE_FIELDS.get(type(value))
+                    if value_field is not None:
+                        setattr(kv_pair.value, value_field, value)
+                    else:
+                        kv_pair.value.string_value = str(value)
+
+            self.client.post(
+                "/v1/traces",
+                content=request.SerializeToString(),
+                headers={"content-type": "application/x-protobuf"},
+            )
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+    """Create test client, shared by all tests and running all requests and WebSockets on one event loop.
+
+    The app state outlives a single test, tests that depend on the filter registry clear it first.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def resource_attributes() -> Dict[str, str]:
+    """Resource attributes of the exported spans, overridden by test modules that need some."""
+    return {}
+
+
+@pytest.fixture
+def tracer_provider(client: TestClient, resource_attributes: Dict[str, str]) -> Iterator[TracerProvider]:
+    """Set up OpenTelemetry tracing that sends batches of spans to the test client.
+
+    Spans are exported when the provider is flushed, so all spans of a test arrive in one request.
+    """
+    provider = TracerProvider()
+    exporter = TestClientExporter(client, resource_attributes)
+    provider.add_span_processor(BatchSpanProcessor(exporter, max_export_batch_size=512, schedule_delay_millis=60_000))
+    yield provider
+    provider.shutdown()
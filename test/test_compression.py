@@ -0,0 +1,41 @@
+"""Unit tests for request body decompression."""
+
+import gzip
+
+from app.utils.compression import gzip_decompress
+
+
+def test_gzip_decompress_single_member() -> None:
+    """A single gzip member is decompressed in one shot."""
+    payload = b"span-data" * 1000
+    assert gzip_decompress(gzip.compress(payload)) == payload
+
+
+def test_gzip_decompress_multi_member_falls_back() -> None:
+    """Concatenated gzip members are fully decompressed."""
+    data = gzip.compress(b"first" * 100) + gzip.compress(b"second" * 50)
+    assert gzip_decompress(data) == b"first" * 100 + b"second" * 50
+
+    data = gzip.compress(b"second" * 50) + gzip.compress(b"first" * 100)
+    assert gzip_decompress(data) == b"second" * 50 + b"first" * 100
+
+
+def test_gzip_decompress_equal_size_members_falls_back() -> None:
+    """Concatenated gzip members of the same uncompressed size are fully decompressed."""
+    data = gzip.compress(b"a" * 100) + gzip.compress(b"b" * 100)
+    assert gzip_decompress(data) == b"a" * 100 + b"b" * 100
+
+    data = gzip.compress(b"a" * 100) * 2
+    assert gzip_decompress(data) == b"a" * 200
+
+
+def test_gzip_decompress_trailing_padding_falls_back() -> None:
+    """Zero padding after the gzip member does not drop the payload."""
+    payload = b"span-data" * 1000
+    for padding in (b"\x00\x00", b"\x00" * 8, b"\x00" * 13):
+        assert gzip_decompress(gzip.compress(payload) + padding) == payload
+
+
+def test_gzip_decompress_empty_payload() -> None:
+    """A gzip member of an empty payload decompresses to empty bytes."""
+    assert gzip_decompress(gzip.compress(b"")) == b""
@@ -0,0 +1,226 @@
+"""Unit tests for the WebSocket connection manager."""
+
+import asyncio
+from typing import Any, List, Optional
+
+from app.core.connection_manager import ConnectionManager
+from app.models.events import AgentEvent
+from app.models.filters import FilterCriteria
+
+BATCH = b'{"type":"batch","events":[event]}'
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a WebSocket that records sent payloads."""
+
+    def __init__(self) -> None:
+        self.sent: List[bytes] = []
+        self.close_code: Optional[int] = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.sent.append(data)
+
+
+class BrokenWebSocket(FakeWebSocket):
+    """WebSocket whose connection was reset."""
+
+    async def send_bytes(self, data: bytes) -> None:
+        raise ConnectionResetError()
+
+
+class StuckWebSocket(FakeWebSocket):
+    """WebSocket whose client stopped reading."""
+
+    async def send_bytes(self, data: bytes) -> None:
+        await asyncio.sleep(10)
+
+
+def _event(conversation_id: str, workforce_name: str | None = None) -> AgentEvent:
+    return AgentEvent(
+        acting_agent="test-agent",
+        conversation_id=conversation_id,
+        timestamp="2024-01-01T00:00:00Z",
+        event_type="agent_start",
+        workforce_name=workforce_name,
+    )
+
+
+async def _connect(manager: ConnectionManager, filter_criteria: FilterCriteria, websocket: Any = None) -> Any:
+    websocket = websocket or FakeWebSocket()
+    await manager.connect(websocket, filter_criteria)
+    return websocket
+
+
+async def _flush() -> None:
+    """Give the writer tasks a chance to send the queued messages."""
+    await asyncio.sleep(0.05)
+
+
+def test_send_batch_only_reaches_matching_connections() -> None:
+    """Events are delivered to unfiltered connections and connections whose filters match."""
+
+    async def scenario() -> None:
+        manager = ConnectionManager()
+        unfiltered = await _connect(manager, FilterCriteria())
+        conv_a = await _connect(manager, FilterCriteria(conversation_id="conv-a"))
+        conv_b = await _connect(manager, FilterCriteria(conversation_id="conv-b"))
+        workforce = await _connect(manager, FilterCriteria(workforce="team"))
+        both = await _connect(manager, FilterCriteria(conversation_id="conv-a", workforce="other-team"))
+
+        manager.send_batch([b"event"], [_event("conv-a", "team")])
+        await _flush()
+
+        assert unfiltered.sent == [BATCH]
+        assert conv_a.sent == [BATCH]
+        assert conv_b.sent == []
+        assert workforce.sent == [BATCH]
+        assert both.sent == []
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_removes_connection() -> None:
+    """Disconnected websockets no longer receive events."""
+
+    async def scenario() -> None:
+        manager = ConnectionManager()
+        websocket = await _connect(manager, FilterCriteria(conversation_id="conv-a"))
+
+        manager.disconnect(websocket)
+        manager.send_batch([b"event"], [_event("conv-a")])
+        await _flush()
+
+        assert manager.connection_count == 0
+        assert websocket.sent == []
+
+    asyncio.run(scenario())
+
+
+def test_failed_send_disconnects_websocket() -> None:
+    """Websockets that fail to receive a message are removed."""
+
+    async def scenario() -> None:
+        manager = ConnectionManager()
+        await _connect(manager, FilterCriteria(), BrokenWebSocket())
+        healthy = await _connect(manager, FilterCriteria())
+
+        manager.send_batch([b"event"], [_event("conv-a")])
+        await _flush()
+
+        assert manager.connection_count == 1
+        assert healthy.sent == [BATCH]
+
+    asyncio.run(scenario())
+
+
+def test_slow_websocket_is_disconnected_without_delaying_others() -> None:
+    """Websockets that exceed the send timeout are removed while others still receive events."""
+
+    async def scenario() -> None:
+        manager = ConnectionManager(send_timeout_seconds=0.01)
+        await _connect(manager, FilterCriteria(), StuckWebSocket())
+        healthy = await _connect(manager, FilterCriteria())
+
+        manager.send_batch([b"event"], [_event("conv-a")])
+        await _flush()
+
+        assert manager.connection_count == 1
+        assert healthy.sent == [BATCH]
+
+    asyncio.run(scenario())
+
+
+def test_websocket_with_full_queue_is_disconnected() -> None:
+    """Websockets that fall too far behind are removed without waiting for their sends."""
+
+    async def scenario() -> None:
+        manager = ConnectionManager(max_queued_messages=1)
+        await _connect(manager, FilterCriteria(), StuckWebSocket())
+        await asyncio.sleep(0)
+
+        for _ in range(3):
+            manager.send_batch([b"event"], [_event("conv-a")])
+
+        assert manager.connection_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_personal_message_is_sent_before_events() -> None:
+    """A personal message queued before a batch is delivered first."""
+
+    async def scenario() -> None:
+        manager = ConnectionManager()
+        websocket = await _connect(manager, FilterCriteria())
+
+        manager.send_personal_message(b"welcome", websocket)
+        manager.send_batch([b"event"], [_event("conv-a")])
+        await _flush()
+
+        assert websocket.sent == [b"welcome", BATCH]
+
+    asyncio.run(scenario())
+
+
+def test_send_batch_combines_matching_events_into_one_frame() -> None:
+    """Each connection receives the events matching its filter in a single batch frame."""
+
+    async def scenario() -> None:
+        manager = ConnectionManager()
+        unfiltered = await _connect(manager, FilterCriteria())
+        conv_a = await _connect(manager, FilterCriteria(conversation_id="conv-a"))
+        conv_c = await _connect(manager, FilterCriteria(conversation_id="conv-c"))
+
+        events = [_event("conv-a"), _event("conv-b"), _event("conv-a")]
+        manager.send_batch([b"1", b"2", b"3"], events)
+        await _flush()
+
+        assert unfiltered.sent == [b'{"type":"batch","events":[1,2,3]}']
+        assert conv_a.sent == [b'{"type":"batch","events":[1,3]}']
+        assert conv_c.sent == []
+
+    asyncio.run(scenario())
+
+
+def test_dropped_websockets_are_closed() -> None:
+    """Websockets dropped for a full queue or a send timeout are closed so their clients can reconnect."""
+
+    async def scenario() -> None:
+        manager = ConnectionManager(send_timeout_seconds=0.01, max_queued_messages=1)
+        overflowing = await _connect(manager, FilterCriteria(), StuckWebSocket())
+        await asyncio.sleep(0)
+        for _ in range(3):
+            manager.send_batch([b"event"], [_event("conv-a")])
+        await _flush()
+
+        assert overflowing.close_code == 1013
+
+        timed_out = await _connect(manager, FilterCriteria(), StuckWebSocket())
+        manager.send_batch([b"event"], [_event("conv-a")])
+        await _flush()
+
+        assert timed_out.close_code == 1013
+        assert manager.connection_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_disconnected_websocket_is_not_closed() -> None:
+    """Websockets removed after their client disconnected are not closed again."""
+
+    async def scenario() -> None:
+        manager = ConnectionManager()
+        websocket = await _connect(manager, FilterCriteria())
+
+        manager.disconnect(websocket)
+        await _flush()
+
+        assert websocket.close_code is None
+
+    asyncio.run(scenario())
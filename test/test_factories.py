@@ -1,7 +1,22 @@
 """Unit tests for factory functions and extractors."""
 
-from app.utils.extractors import extract_invoked_agent
-from app.utils.factories import _is_agent_tool_call
+from app.models.content import (
+    LlmRequestContent,
+    LlmResponseContent,
+    TextContent,
+    ToolCall,
+    ToolResponse,
+    UsageMetadata,
+)
+from app.utils.extractors import (
+    extract_invoked_agent,
+    extract_llm_request_content,
+    extract_llm_response_content,
+    extract_tool_call,
+    extract_usage_metadata,
+    parse_llm_content_key,
+)
+from app.utils.factories import _is_agent_tool_call, create_tool_call_end_event
 
 
 class TestIsAgentToolCall:
@@ -13,7 +28,7 @@ class TestIsAgentToolCall:
             "tool_name": "cross_selling_agent",
             "args.request": "Analyze customer cust001",
         }
-        assert _is_agent_tool_call(attrs) is True
+        assert _is_agent_tool_call(extract_tool_call(attrs)) is True
 
     def test_transfer_to_agent(self) -> None:
         """transfer_to_agent is always an agent invocation."""
@@ -21,7 +36,7 @@ class TestIsAgentToolCall:
             "tool_name": "transfer_to_agent",
             "args.agent_name": "weather-agent",
         }
-        assert _is_agent_tool_call(attrs) is True
+        assert _is_agent_tool_call(extract_tool_call(attrs)) is True
 
     def test_mcp_tool_with_multiple_args(self) -> None:
         """MCP tools with multiple args are not agent calls."""
@@ -31,7 +46,7 @@ class TestIsAgentToolCall:
             "args.subject": "Test",
             "args.body": "Hello",
         }
-        assert _is_agent_tool_call(attrs) is False
+        assert _is_agent_tool_call(extract_tool_call(attrs)) is False
 
     def test_regular_tool_with_single_non_request_arg(self) -> None:
         """Tools with a single arg that isn't 'request' are not agent calls."""
@@ -39,16 +54,16 @@ class TestIsAgentToolCall:
             "tool_name": "get_weather",
             "args.city": "Munich",
         }
-        assert _is_agent_tool_call(attrs) is False
+        assert _is_agent_tool_call(extract_tool_call(attrs)) is False
 
     def test_empty_attributes(self) -> None:
         """Empty attributes should not match as agent call."""
-        assert _is_agent_tool_call({}) is False
+        assert _is_agent_tool_call(extract_tool_call({})) is False
 
     def test_no_args(self) -> None:
         """Tool with no args should not match as agent call."""
         attrs = {"tool_name": "some_tool"}
-        assert _is_agent_tool_call(attrs) is False
+        assert _is_agent_tool_call(extract_tool_call(attrs)) is False
 
 
 class TestExtractInvokedAgent:
@@ -78,3 +93,93 @@ class TestExtractInvokedAgent:
         """transfer_to_agent without args.agent_name returns empty string."""
         attrs = {"tool_name": "transfer_to_agent"}
         assert extract_invoked_agent(attrs) == ""
+
+
+class TestExtractLlmContent:
+    """Tests for extracting LLM request and response content from span attributes."""
+
+    def test_request_content_with_tool_response(self) -> None:
+        """Texts come first, followed by tool responses with their response fields."""
+        attrs = {
+            "user_content.role": "user",
+            "user_content.parts.0.function_response.name": "get_weather",
+            "llm_request.content.parts.0.function_response.response.temperature": "20",
+            "llm_request.content.parts.1.function_response.response.ignored": "x",
+            "user_content.parts.1.text": "What is the weather?",
+        }
+        assert extract_llm_request_content(attrs) == LlmRequestContent(
+            role="user",
+            content=[
+                TextContent(text="What is the weather?"),
+                ToolResponse(tool_name="get_weather", response={"temperature": "20"}),
+            ],
+        )
+
+    def test_response_content_with_tool_call(self) -> None:
+        """Texts carry their thought flag and tool calls carry their arguments."""
+        attrs = {
+            "llm_response.content.role": "model",
+            "llm_response.content.parts.0.text": "Let me check.",
+            "llm_response.content.parts.0.thought": True,
+            "llm_response.content.parts.1.function_call.args.city": "New York",
+            "llm_response.content.parts.1.function_call.name": "get_weather",
+        }
+        assert extract_llm_response_content(attrs) == LlmResponseContent(
+            role="model",
+            parts=[
+                TextContent(text="Let me check.", thought=True),
+                ToolCall(tool_name="get_weather", arguments={"city": "New York"}),
+            ],
+        )
+
+
+class TestExtractUsageMetadata:
+    """Tests for extracting token counts from span attributes."""
+
+    def test_token_counts(self) -> None:
+        """Reported counters are copied and missing counters default to 0."""
+        attrs = {
+            "llm_response.usage_metadata.total_token_count": 10,
+            "llm_response.usage_metadata.prompt_token_count": 4,
+            "llm_response.usage_metadata.candidates_token_count": 6,
+        }
+        assert extract_usage_metadata(attrs) == UsageMetadata(total_tokens=10, prompt_tokens=4, candidate_tokens=6)
+
+    def test_no_usage_metadata(self) -> None:
+        """Responses without usage metadata get empty counters."""
+        assert extract_usage_metadata({"llm_response.content.role": "model"}) == UsageMetadata()
+
+
+class TestToolCallEndResponse:
+    """Tests for parsing the tool response text of tool call end events."""
+
+    @staticmethod
+    def _response_text(text: str) -> object:
+        attrs = {"tool_name": "get_weather", "args.city": "Munich", "tool_response.content.text": text}
+        event = create_tool_call_end_event("agent", "conv", "2024-01-01T00:00:00Z", attrs, {})
+        return event.response["text"]
+
+    def test_json_text_is_parsed(self) -> None:
+        """Texts holding a JSON object or array are parsed."""
+        assert self._response_text(' {"temperature": 20}') == {"temperature": 20}
+        assert self._response_text("[1, 2]") == [1, 2]
+
+    def test_plain_text_is_kept(self) -> None:
+        """Plain and malformed texts are kept as strings."""
+        assert self._response_text("It is sunny") == "It is sunny"
+        assert self._response_text("{not json") == "{not json"
+
+
+class TestParseLlmContentKey:
+    """Tests for splitting LLM content keys into their part prefix and origin."""
+
+    def test_supported_part(self) -> None:
+        """Keys of supported parts are split after the part number."""
+        assert parse_llm_content_key("llm_request.content.parts.0.text") == ("llm_request.content.parts.0", "text")
+        assert parse_llm_content_key("parts.1.function_call.args.city") == ("parts.1", "function_call")
+
+    def test_unsupported_key(self) -> None:
+        """Keys without a supported part are rejected."""
+        assert parse_llm_content_key("llm_request.content.parts.0.unknown") is None
+        assert parse_llm_content_key("llm_request.content.parts.0") is None
+        assert parse_llm_content_key("llm_request.content.role") is None
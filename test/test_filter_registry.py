@@ -0,0 +1,41 @@
+"""Unit tests for the filter registry."""
+
+import time
+
+from app.core.filter_registry import FilterRegistry
+
+
+def test_expired_values_are_removed() -> None:
+    """Values not seen within the TTL are dropped, recently seen values are kept."""
+    registry = FilterRegistry(ttl_hours=1, cleanup_interval_seconds=0)
+    registry.register_event("old-conv", "old-team")
+    registry.register_event("new-conv", "new-team")
+
+    expired = time.monotonic() - 2 * 3600
+    registry.conversation_ids["old-conv"] = expired
+    registry.workforce_names["old-team"] = expired
+
+    assert registry.get_conversation_ids() == ["new-conv"]
+    assert registry.get_workforce_names() == ["new-team"]
+
+
+def test_registering_again_refreshes_value() -> None:
+    """A value seen again moves behind newer values and is not expired with its first sighting."""
+    registry = FilterRegistry(ttl_hours=1, cleanup_interval_seconds=0, refresh_interval_seconds=0)
+    registry.register_event("conv-a", None)
+    registry.register_event("conv-b", None)
+    registry.register_event("conv-a", None)
+
+    assert list(registry.conversation_ids) == ["conv-b", "conv-a"]
+
+
+def test_recently_seen_value_is_not_refreshed() -> None:
+    """Values seen again within the refresh interval keep their last seen time and position."""
+    registry = FilterRegistry(refresh_interval_seconds=60)
+    registry.register_event("conv-a", None)
+    first_seen = registry.conversation_ids["conv-a"]
+    registry.register_event("conv-b", None)
+    registry.register_event("conv-a", None)
+
+    assert registry.conversation_ids["conv-a"] == first_seen
+    assert list(registry.conversation_ids) == ["conv-a", "conv-b"]
@@ -0,0 +1,33 @@
+"""Unit tests for WebSocket filter criteria."""
+
+import pytest
+
+from app.models.events import AgentEvent
+from app.models.filters import FilterCriteria
+
+FILTERS = [
+    FilterCriteria(),
+    FilterCriteria(conversation_id="conv-a"),
+    FilterCriteria(workforce="team"),
+    FilterCriteria(conversation_id="conv-a", workforce="team"),
+]
+EVENTS = [
+    AgentEvent("agent", conversation_id, "2024-01-01T00:00:00Z", "agent_start", workforce_name=workforce_name)
+    for conversation_id in ("conv-a", "conv-b")
+    for workforce_name in ("team", "other-team", None)
+]
+
+
+@pytest.mark.parametrize("filter_criteria", FILTERS, ids=repr)
+def test_compile_agrees_with_matches(filter_criteria: FilterCriteria) -> None:
+    """The compiled predicate accepts exactly the events that matches() accepts."""
+    matcher = filter_criteria.compile()
+    for event in EVENTS:
+        assert matcher(event) is filter_criteria.matches(event)
+
+
+def test_from_query_params_without_filters_returns_empty() -> None:
+    """Query parameters without filter keys share the EMPTY criteria."""
+    assert FilterCriteria.from_query_params({"other": "x"}) is FilterCriteria.EMPTY
+    assert FilterCriteria.from_query_params({"workforce": "team"}) == FilterCriteria(workforce="team")
+    assert FilterCriteria.EMPTY.is_empty()
@@ -1,164 +1,142 @@
 """Integration tests for trace receiving and event sending."""
 
-import json
-import signal
+import asyncio
+import gzip
+import os
+import threading
 import time
+import weakref
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Any, Dict, List, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
+import orjson
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from opentelemetry import trace
 from opentelemetry.proto.collector.trace.v1 import trace_service_pb2
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
 from starlette.testclient import WebSocketTestSession
-from starlette.websockets import WebSocketDisconnect
 
-from app.main import app
+from app.api.routes.traces import router as trace_router
 
 
 @pytest.fixture
-def client() -> TestClient:
-    """Create test client."""
-    return TestClient(app)
+def minimal_client() -> Iterator[TestClient]:
+    """Create test client for an app with only the trace endpoint, for tests of its error handling."""
+    minimal_app = FastAPI()
+    minimal_app.include_router(trace_router)
+    with TestClient(minimal_app) as test_client:
+        yield test_client
 
 
-@pytest.fixture
-def tracer_provider(client: TestClient) -> TracerProvider:
-    """Set up OpenTelemetry tracing that sends to the test client."""
-    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
-
-    provider = TracerProvider()
-
-    class TestClientExporter(SpanExporter):
-        def export(self, spans: Sequence[Any]) -> SpanExportResult:
-            if spans:
-                request = trace_service_pb2.ExportTraceServiceRequest()
-                resource_spans = request.resource_spans.add()
-                scope_spans = resource_spans.scope_spans.add()
-
-                for span in spans:
-                    if span.attributes and span.attributes.get("conversation_id"):
-                        otlp_span = scope_spans.spans.add()
-                        otlp_span.name = span.name
-                        otlp_span.span_id = span.context.span_id.to_bytes(8, "big")
-                        otlp_span.trace_id = span.context.trace_id.to_bytes(16, "big")
-                        otlp_span.start_time_unix_nano = span.start_time or 0
-                        otlp_span.end_time_unix_nano = span.end_time or span.start_time or 0
-
-                        if span.attributes:
-                            for key, value in span.attributes.items():
-                                kv_pair = otlp_span.attributes.add()
-                                kv_pair.key = key
-                                if isinstance(value, str):
-                                    kv_pair.value.string_value = value
-                                elif isinstance(value, bool):
-                                    kv_pair.value.bool_value = value
-                                elif isinstance(value, int):
-                                    kv_pair.value.int_value = value
-                                else:
-                                    kv_pair.value.string_value = str(value)
-
-                client.post(
-                    "/v1/traces",
-                    content=request.SerializeToString(),
-                    headers={"content-type": "application/x-protobuf"},
-                )
-            return SpanExportResult.SUCCESS
-
-        def shutdown(self) -> None:
-            pass
-
-    processor = SimpleSpanProcessor(TestClientExporter())
-    provider.add_span_processor(processor)
-    trace.set_tracer_provider(provider)
-    return provider
-
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_spans_data() -> List[Dict[str, Any]]:
-    """Load mock spans data from JSON file."""
+    """Load mock spans data from JSON file, once for all tests. Tests must not modify it."""
     mock_file = Path(__file__).parent / "mock_spans.json"
-    with open(mock_file) as f:
-        data: List[Dict[str, Any]] = json.load(f)
-        return data
+    data: List[Dict[str, Any]] = orjson.loads(mock_file.read_bytes())
+    return data
+
+
+@pytest.fixture(scope="session")
+def conversation_1(mock_spans_data: List[Dict[str, Any]]) -> str:
+    """Find the conversation_id of the first mock span that has one."""
+    for span_data in mock_spans_data:
+        if "conversation_id" in span_data.get("attributes", {}):
+            conversation_id: str = span_data["attributes"]["conversation_id"]
+            return conversation_id
+    pytest.fail("Could not find conversation_id in mock data")
 
 
-def timeout_handler(signum: int, frame: Any) -> None:
-    """Handle timeout signal."""
-    raise TimeoutError("WebSocket receive timeout")
+# Receives that timed out are still running on their thread, they are finished by the next receive of the session
+_pending_receives: "weakref.WeakKeyDictionary[WebSocketTestSession, Future[bytes]]" = weakref.WeakKeyDictionary()
 
 
-def receive_with_timeout(websocket: WebSocketTestSession) -> Dict[str, Any]:
-    """Receive JSON from WebSocket with proper timeout using signal."""
-    old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(1)
+def _receive_bytes_within(websocket: WebSocketTestSession, timeout: float) -> bytes:
+    """Receive the next binary frame sent to the test session, waiting at most timeout seconds.
+
+    receive_bytes() blocks without a timeout, so it runs on a daemon thread. A receive that times out is
+    picked up again by the next call, so no frame is lost to an abandoned thread.
+    """
+    pending = _pending_receives.get(websocket)
+    if pending is None:
+        pending = Future()
+
+        def receive(future: Future[bytes]) -> None:
+            try:
+                future.set_result(websocket.receive_bytes())
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=receive, args=(pending,), daemon=True).start()
+        _pending_receives[websocket] = pending
 
     try:
-        data: Dict[str, Any] = websocket.receive_json()
-        return data
+        return pending.result(timeout)
     finally:
-        signal.alarm(0)
-        signal.signal(signal.SIGALRM, old_handler)
+        if pending.done():
+            del _pending_receives[websocket]
 
 
-def create_test_spans_from_mock_data(mock_data: List[Dict[str, Any]], client: TestClient) -> None:
-    """Create OpenTelemetry spans from mock data and send them to the endpoint."""
-    tracer = trace.get_tracer(__name__)
+def receive_with_timeout(websocket: WebSocketTestSession, timeout: float = 1.0) -> List[Dict[str, Any]]:
+    """Receive a batch of JSON events (sent as binary frame) from WebSocket, raising TimeoutError if none arrives."""
+    data: Dict[str, Any] = orjson.loads(_receive_bytes_within(websocket, timeout))
+    assert data["type"] == "batch"
+    events: List[Dict[str, Any]] = data["events"]
+    return events
 
-    for span_data in mock_data:
-        start_time = time.time_ns()
-        with tracer.start_as_current_span(span_data.get("name", "test_span"), start_time=start_time) as span:
-            attributes = span_data.get("attributes", {})
-            for key, value in attributes.items():
-                span.set_attribute(key, value)
 
+def receive_events(
+    websocket: WebSocketTestSession, expected: Optional[int] = None, timeout: float = 0.5
+) -> List[Dict[str, Any]]:
+    """Receive the events of the batches sent to the WebSocket.
 
-def test_full_system_integration(
-    client: TestClient, mock_spans_data: List[Dict[str, Any]], tracer_provider: TracerProvider
-) -> None:
-    """Test complete system: receive spans -> process -> send to WebSockets."""
-    conversation_1 = None
-    for span_data in mock_spans_data:
-        if "conversation_id" in span_data.get("attributes", {}):
-            conversation_1 = span_data["attributes"]["conversation_id"]
+    Stops once at least the expected number of events arrived, or when no batch arrives within the timeout.
+    """
+    events: List[Dict[str, Any]] = []
+    while expected is None or len(events) < expected:
+        try:
+            events.extend(receive_with_timeout(websocket, timeout))
+        except TimeoutError:
             break
+    return events
+
+
+def create_test_spans_from_mock_data(mock_data: List[Dict[str, Any]], tracer_provider: TracerProvider) -> None:
+    """Create OpenTelemetry spans from mock data and send them to the endpoint in one request."""
+    tracer = tracer_provider.get_tracer(__name__)
+    # Bound once instead of looked up for every span
+    start_span = tracer.start_as_current_span
+    time_ns = time.time_ns
 
-    assert conversation_1 is not None, "Could not find conversation_id in mock data"
+    for span_data in mock_data:
+        with start_span(span_data.get("name", "test_span"), start_time=time_ns()) as span:
+            span.set_attributes(span_data.get("attributes", {}))
+
+    tracer_provider.force_flush()
 
-    global_events = []
-    conversation_events = []
 
+def test_full_system_integration(
+    client: TestClient, mock_spans_data: List[Dict[str, Any]], conversation_1: str, tracer_provider: TracerProvider
+) -> None:
+    """Test complete system: receive spans -> process -> send to WebSockets."""
     # Connect to global stream (no filter)
     with client.websocket_connect("/ws") as global_ws:
-        welcome = global_ws.receive_json()
+        welcome = global_ws.receive_json(mode="binary")
         assert welcome["type"] == "connection_established"
         assert welcome["filters"]["conversation_id"] is None
         assert welcome["filters"]["workforce"] is None
 
         # Connect to conversation-specific stream using query parameter
         with client.websocket_connect(f"/ws?conversation_id={conversation_1}") as conv_ws:
-            conv_welcome = conv_ws.receive_json()
+            conv_welcome = conv_ws.receive_json(mode="binary")
             assert conv_welcome["type"] == "connection_established"
             assert conv_welcome["filters"]["conversation_id"] == conversation_1
 
-            create_test_spans_from_mock_data(mock_spans_data, client)
-            time.sleep(0.1)
-
-            for _ in range(35):
-                try:
-                    event = receive_with_timeout(conv_ws)
-                    conversation_events.append(event)
-                except (WebSocketDisconnect, TimeoutError):
-                    pass
+            create_test_spans_from_mock_data(mock_spans_data, tracer_provider)
 
-            for _ in range(40):
-                try:
-                    event = receive_with_timeout(global_ws)
-                    global_events.append(event)
-                except (WebSocketDisconnect, TimeoutError):
-                    pass
+            conversation_events = receive_events(conv_ws, expected=30)
+            global_events = receive_events(global_ws, expected=34)
 
     assert len(global_events) == 34, f"Expected 34 global events, got {len(global_events)}"
     assert len(conversation_events) == 30, f"Expected 30 conversation events, got {len(conversation_events)}"
@@ -168,47 +146,109 @@ def test_full_system_integration(
 
 
 def test_conversation_filtering(
-    client: TestClient, mock_spans_data: List[Dict[str, Any]], tracer_provider: TracerProvider
+    client: TestClient, mock_spans_data: List[Dict[str, Any]], conversation_1: str, tracer_provider: TracerProvider
 ) -> None:
     """Test that conversation-specific WebSocket only receives events for that conversation."""
-    conversation_1 = None
-    for span_data in mock_spans_data:
-        if "conversation_id" in span_data.get("attributes", {}):
-            conversation_1 = span_data["attributes"]["conversation_id"]
-            break
-
-    assert conversation_1 is not None, "Could not find conversation_id in mock data"
-    events_received = []
-
     # Connect with conversation_id filter using query parameter
     with client.websocket_connect(f"/ws?conversation_id={conversation_1}") as websocket:
-        websocket.receive_json()
-        create_test_spans_from_mock_data(mock_spans_data, client)
-        time.sleep(0.1)
-
-        try:
-            for _ in range(35):
-                event = receive_with_timeout(websocket)
-                events_received.append(event)
-        except (WebSocketDisconnect, TimeoutError):
-            pass
+        websocket.receive_json(mode="binary")
+        create_test_spans_from_mock_data(mock_spans_data, tracer_provider)
+        events_received = receive_events(websocket, expected=1)
 
     assert len(events_received) > 0, "Expected some events to be received"
     for event in events_received:
         assert event.get("conversation_id") == conversation_1
 
 
-def test_invalid_trace_data(client: TestClient) -> None:
+def test_invalid_trace_data(minimal_client: TestClient) -> None:
     """Test handling of invalid trace data."""
-    response = client.post(
+    response = minimal_client.post(
         "/v1/traces", content=b"invalid protobuf data", headers={"content-type": "application/x-protobuf"}
     )
     assert response.status_code == 400
 
 
-def test_empty_trace_data(client: TestClient) -> None:
+def test_empty_trace_data(minimal_client: TestClient) -> None:
     """Test handling of empty trace data."""
     # Send empty content - the endpoint should handle gracefully
-    response = client.post("/v1/traces", content=b"", headers={"content-type": "application/x-protobuf"})
+    response = minimal_client.post("/v1/traces", content=b"", headers={"content-type": "application/x-protobuf"})
     # Empty data might return 400, which is acceptable behavior
     assert response.status_code in [200, 400]
+
+
+def test_json_trace_data(client: TestClient) -> None:
+    """Test that JSON trace data is accepted regardless of media type parameters and case."""
+    response = client.post(
+        "/v1/traces",
+        content=b'{"resourceSpans": []}',
+        headers={"content-type": "Application/JSON; charset=utf-8"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {}
+
+
+def test_gzip_trace_data(client: TestClient) -> None:
+    """Test that gzip encoded protobuf trace data is accepted."""
+    request = trace_service_pb2.ExportTraceServiceRequest()
+    request.resource_spans.add().scope_spans.add().spans.add(name="before_agent_callback")
+
+    response = client.post(
+        "/v1/traces",
+        content=gzip.compress(request.SerializeToString()),
+        headers={"content-type": "application/x-protobuf", "content-encoding": "gzip"},
+    )
+    assert response.status_code == 200
+
+
+def test_large_gzip_trace_data(client: TestClient) -> None:
+    """Test that bodies large enough to be decompressed and parsed in a worker thread are accepted."""
+    request = trace_service_pb2.ExportTraceServiceRequest()
+    spans = request.resource_spans.add().scope_spans.add().spans
+    for _ in range(1000):
+        spans.add(name=os.urandom(512).hex())
+    body = gzip.compress(request.SerializeToString())
+    assert len(body) > 256 * 1024
+
+    response = client.post(
+        "/v1/traces",
+        content=body,
+        headers={"content-type": "application/x-protobuf", "content-encoding": "gzip"},
+    )
+    assert response.status_code == 200
+
+
+def test_small_gzip_body_with_large_export_is_parsed_in_worker_thread(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the worker thread decision uses the decompressed size, also for JSON bodies."""
+    offloaded: List[str] = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func: Callable[..., Any], /, *args: Any) -> Any:
+        offloaded.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", recording_to_thread)
+
+    spans = [{"name": "before_agent_callback" * 100} for _ in range(200)]
+    body = gzip.compress(orjson.dumps({"resourceSpans": [{"scopeSpans": [{"spans": spans}]}]}))
+    assert len(body) < 256 * 1024
+
+    response = client.post(
+        "/v1/traces",
+        content=body,
+        headers={"content-type": "application/json", "content-encoding": "gzip"},
+    )
+    assert response.status_code == 200
+    assert offloaded == ["gzip_decompress", "_parse_json"]
+
+
+def test_invalid_gzip_trace_data(client: TestClient) -> None:
+    """Test handling of a body that claims gzip encoding but is not compressed."""
+    response = client.post(
+        "/v1/traces",
+        content=b"not gzip",
+        headers={"content-type": "application/x-protobuf", "content-encoding": "gzip"},
+    )
+    assert response.status_code == 400
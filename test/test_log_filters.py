@@ -0,0 +1,30 @@
+"""Unit tests for the access log endpoint filter."""
+
+import logging
+
+from app.utils.log_filters import EndpointFilter
+
+
+def _access_record(path: str) -> logging.LogRecord:
+    """Create a record shaped like a uvicorn access log entry."""
+    return logging.LogRecord(
+        "uvicorn.access",
+        logging.INFO,
+        __file__,
+        0,
+        '%s - "%s %s HTTP/%s" %d',
+        ("127.0.0.1", "GET", path, "1.1", 200),
+        None,
+    )
+
+
+def test_excluded_endpoint_is_filtered() -> None:
+    """Access logs of excluded endpoints are dropped."""
+    assert EndpointFilter(["/health"]).filter(_access_record("/health")) is False
+
+
+def test_other_endpoints_are_logged() -> None:
+    """Access logs of other endpoints and records of other shapes are kept."""
+    endpoint_filter = EndpointFilter(["/health"])
+    assert endpoint_filter.filter(_access_record("/v1/traces")) is True
+    assert endpoint_filter.filter(logging.LogRecord("app", logging.INFO, __file__, 0, "message", None, None)) is True